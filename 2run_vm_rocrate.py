@@ -1,16 +1,20 @@
 import json
 import yaml
-import subprocess
 import os
 
+from backends import launch
+from jsonld_contexts import normalize_record
+from timing import span, timed, timed_command
+
+@timed("crate_generation")
 def generate_ro_crate(codemeta_path, output_yaml, repo_url):
     """Converts Codemeta to RO-Crate YAML and extracts VM specs + GitHub Repo."""
     if not os.path.exists(codemeta_path):
         print(f"❌ Error: {codemeta_path} not found.")
         return None
 
-    with open(codemeta_path, 'r') as f:
-        cm = json.load(f)
+    with span("metadata_fetch", input=codemeta_path), open(codemeta_path, 'r') as f:
+        cm = normalize_record(json.load(f))
 
     deps = cm.get("softwareRequirements", [])
     if isinstance(deps, str):
@@ -57,8 +61,11 @@ def generate_ro_crate(codemeta_path, output_yaml, repo_url):
     print(f"✅ Generated RO-Crate file: {output_yaml}")
     return ro_crate_data
 
-def launch_vm_with_repo(crate_data):
-    """Creates Cloud-init config, clones the repo, and launches the VM."""
+def launch_vm_with_repo(crate_data, quiet=False, golden=False, backend=None):
+    """Creates Cloud-init config, clones the repo, and launches the VM (multipass unless another backend is given).
+
+    quiet, golden and backend are passed to backends.launch().
+    """
     main_node = next(n for n in crate_data["@graph"] if n["@id"] == "./")
     specs = main_node["virtualization"]
     deps = main_node["dependencies"]
@@ -71,37 +78,18 @@ def launch_vm_with_repo(crate_data):
         "package_update": True,
         "packages": deps,
         "runcmd": [
-            f"git clone {repo_url} /home/ubuntu/{repo_name}",
+            timed_command("git_clone", f"git clone {repo_url} /home/ubuntu/{repo_name}"),
             f"cd /home/ubuntu/{repo_name}",
             # Attempt to run a setup or main script if it exists
-            "if [ -f requirements.txt ]; then pip3 install -r requirements.txt; fi",
+            timed_command("pip_install", "if [ -f requirements.txt ]; then pip3 install -r requirements.txt; fi"),
             "echo '--- Repository Ready ---' >> /home/ubuntu/setup.log"
         ]
     }
-    
-    with open("init.yaml", "w") as f:
-        yaml.dump(cloud_init, f)
-
-    print(f"🚀 Provisioning VM '{vm_name}' for repo: {repo_url}...")
 
-    cmd = [
-        "multipass", "launch",
-        "--name", vm_name,
-        "--cpus", str(specs["cpus"]),
-        "--memory", specs["memory"],
-        "--disk", specs["disk"],
-        "--cloud-init", "init.yaml",
-        specs["os"]
-    ]
-	
-    try:
-        subprocess.run(cmd, check=True)
-        print(f"✨ Success! VM '{vm_name}' is live and code is cloned.")
-        print(f"👉 Enter with: multipass shell {vm_name}")
-        print(f"📂 Code located at: /home/ubuntu/{repo_name}")
-    finally:
-        if os.path.exists("init.yaml"):
-            os.remove("init.yaml")
+    backend = launch(vm_name, specs, deps, cloud_init, quiet=quiet, golden=golden, backend=backend)
+    print(f"✨ Success! VM '{vm_name}' is live and code is cloned.")
+    print(f"👉 Enter with: {backend.shell_command(vm_name)}")
+    print(f"📂 Code located at: /home/ubuntu/{repo_name}")
 
 if __name__ == "__main__":
     # --- CONFIGURATION ---
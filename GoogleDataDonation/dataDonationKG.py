@@ -1,38 +1,41 @@
-import json
-from rdflib import Graph, Literal, RDF, URIRef, Namespace
-from rdflib.namespace import XSD
-
-# Manually define the Schema.org namespace
-SCHEMA = Namespace("http://schema.org/")
-
-# Now you can use it just like before:
-# g.add((event_uri, SCHEMA.location, Literal("Central Park")))
-
-def create_knowledge_graph(data_source):
-    # 1. Initialize the Graph and Namespaces
-    g = Graph()
-    EX = Namespace("http://example.org/user/")
-    
-    # 2. Load your Google Data (Simulated JSON structure)
-    # In a real scenario, use: with open('location_history.json') as f: data = json.load(f)
-    data = [
-        {"timestamp": "2026-02-06T10:00:00Z", "place": "Central Park", "activity": "Walking"},
-        {"timestamp": "2026-02-06T12:00:00Z", "place": "Joe's Coffee", "activity": "Stationary"}
-    ]
-
-    for i, entry in enumerate(data):
-        # Create a unique URI for each event
-        event_uri = EX[f"event_{i}"]
-        
-        # 3. Add Triples (Subject -> Predicate -> Object)
-        g.add((event_uri, RDF.type, SCHEMA.Event))
-        g.add((event_uri, SCHEMA.startDate, Literal(entry['timestamp'], datatype=XSD.dateTime)))
-        g.add((event_uri, SCHEMA.location, Literal(entry['place'])))
-        g.add((event_uri, SCHEMA.description, Literal(entry['activity'])))
-
-    # 4. Serialize the graph to a file (Turtle format is very readable)
-    g.serialize(destination='google_donation_kg.ttl', format='turtle')
-    print("Knowledge Graph created: google_donation_kg.ttl")
+import os
+import sys
+
+from rdflib import Graph
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from json_stream import iter_chunks, iter_items
+from kg_builder import donation_triples, write_triples
+
+# Used when no donation export is available
+SAMPLE_DATA = [
+    {"timestamp": "2026-02-06T10:00:00Z", "place": "Central Park", "activity": "Walking"},
+    {"timestamp": "2026-02-06T12:00:00Z", "place": "Joe's Coffee", "activity": "Stationary"}
+]
+
+def create_knowledge_graph(data_source, output_file="google_donation_kg.ttl"):
+    # 1. Load your Google Data: a JSON array of events, read one entry at a time
+    if os.path.exists(data_source):
+        entries = iter_items(iter_chunks(data_source))
+    else:
+        entries = SAMPLE_DATA
+
+    # 2. Turn every event into triples (Subject -> Predicate -> Object)
+    triples = donation_triples(entries)
+
+    # 3. Large exports are streamed to N-Triples/N-Quads in batches;
+    # Turtle needs the whole graph in memory, so it is only for small ones
+    if output_file.endswith((".nt", ".nq")):
+        graph_name = "http://example.org/user/donation" if output_file.endswith(".nq") else None
+        count = write_triples(triples, output_file, graph_name)
+    else:
+        g = Graph()
+        g.addN((s, p, o, g) for s, p, o in triples)
+        g.serialize(destination=output_file, format='turtle')
+        count = len(g)
+    print(f"Knowledge Graph created: {output_file} ({count} triples)")
 
 if __name__ == "__main__":
-    create_knowledge_graph("google_data.json")
\ No newline at end of file
+    create_knowledge_graph(sys.argv[1] if len(sys.argv) > 1 else "google_data.json",
+                           sys.argv[2] if len(sys.argv) > 2 else "google_donation_kg.ttl")
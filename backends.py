@@ -0,0 +1,206 @@
+import json
+import os
+import shlex
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+
+import yaml
+
+from package_cache import with_package_cache
+from timing import collect_guest_spans, span, timed_command
+
+# Used when a launcher is not told which backend to use
+DEFAULT_BACKEND = os.environ.get("VM_BACKEND", "multipass")
+
+BACKENDS = {}
+
+def register_backend(name, factory):
+    """Makes a backend available to get_backend(name); factory is called without arguments."""
+    BACKENDS[name] = factory
+
+def get_backend(backend=None):
+    """A backend instance: pass one through, or look it up by name (default $VM_BACKEND or multipass)."""
+    if backend is None or isinstance(backend, str):
+        name = backend or DEFAULT_BACKEND
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown backend {name!r}, choose from {', '.join(sorted(BACKENDS))}")
+        return BACKENDS[name]()
+    return backend
+
+def launch(vm_name, specs, deps, cloud_init, quiet=False, golden=False, backend=None):
+    """Launches one VM the way every launcher script does; returns the backend used.
+
+    quiet captures the tools' output instead of printing it, for concurrent
+    launches. golden clones a prebuilt image with the same dependencies
+    instead of installing them (multipass only; other backends always
+    provision from scratch). The launch and the guest's own phases are
+    recorded as timing spans.
+    """
+    # Imported here: golden_images itself builds on setup_script()
+    from golden_images import launch_from_golden
+
+    backend = get_backend(backend)
+    golden = golden and backend.name == "multipass"
+    if golden:
+        print(f"🚀 Cloning VM '{vm_name}' from the golden image for its dependencies...")
+    else:
+        print(f"🚀 Provisioning VM '{vm_name}' ({backend.name}) with dependencies: {', '.join(deps)}...")
+    with span("vm_launch", vm=vm_name, backend=backend.name, golden=golden):
+        if golden:
+            launch_from_golden(vm_name, specs, deps, cloud_init.get("runcmd"), quiet=quiet)
+        else:
+            backend.launch(vm_name, specs, with_package_cache(cloud_init), quiet=quiet)
+    collect_guest_spans(vm_name, backend, cloud_init=not golden)
+    return backend
+
+def setup_script(cloud_init):
+    """The shell equivalent of the cloud-init subset our launchers generate.
+
+    Covers write_files, apt.proxy, package_update, packages and runcmd, so
+    backends without cloud-init provision the same environment.
+    """
+    lines = ["set -e", "export DEBIAN_FRONTEND=noninteractive"]
+    for entry in cloud_init.get("write_files", []):
+        lines.append(f"mkdir -p {shlex.quote(os.path.dirname(entry['path']))}")
+        lines.append(f"printf '%s' {shlex.quote(entry['content'])} > {shlex.quote(entry['path'])}")
+        if entry.get("owner"):
+            lines.append(f"chown {shlex.quote(entry['owner'])} {shlex.quote(os.path.dirname(entry['path']))} "
+                         f"{shlex.quote(entry['path'])} || true")  # The user may not exist (containers)
+    proxy = cloud_init.get("apt", {}).get("proxy")
+    if proxy:
+        lines.append(f"echo 'Acquire::http::Proxy \"{proxy}\";' > /etc/apt/apt.conf.d/01proxy")
+    if cloud_init.get("package_update") or cloud_init.get("packages"):
+        lines.append("apt-get update -q")
+    if cloud_init.get("packages"):
+        lines.append(timed_command("package_install", "apt-get install -y -q " + " ".join(shlex.quote(p) for p in cloud_init["packages"])))
+    lines.extend(cloud_init.get("runcmd", []))
+    return "\n".join(lines) + "\n"
+
+class MultipassBackend:
+    """Full Ubuntu VMs via multipass, provisioned by cloud-init."""
+
+    name = "multipass"
+
+    def launch(self, vm_name, specs, cloud_init, quiet=False):
+        cmd = ["multipass", "launch",
+               "--name", vm_name,
+               "--cpus", str(specs["cpus"]),
+               "--memory", specs["memory"],
+               "--disk", specs["disk"]]
+        if not cloud_init:
+            subprocess.run(cmd + [specs["os"]], check=True, capture_output=quiet, text=True)
+            return
+        # One file per VM, so several launches can run at the same time
+        with span("cloud_init_render", vm=vm_name, backend=self.name), \
+                tempfile.NamedTemporaryFile("w", prefix=f"init-{vm_name}-", suffix=".yaml", delete=False) as f:
+            yaml.dump(cloud_init, f)
+        try:
+            subprocess.run(cmd + ["--cloud-init", f.name, specs["os"]], check=True, capture_output=quiet, text=True)
+        finally:
+            os.remove(f.name)
+
+    def run(self, vm_name, args):
+        """stdout of args run inside the VM, or None when it fails."""
+        result = subprocess.run(["multipass", "exec", vm_name, "--", *args], capture_output=True, text=True)
+        return result.stdout if result.returncode == 0 else None
+
+    def shell_command(self, vm_name):
+        return f"multipass shell {vm_name}"
+
+class ContainerBackend:
+    """Ubuntu userland containers via podman (or docker); starts in about a second.
+
+    cpus and memory become container limits; disk is not limited since
+    containers share the host's storage.
+    """
+
+    name = "container"
+
+    def __init__(self, engine=None):
+        self.engine = engine or os.environ.get("CONTAINER_ENGINE") or ("podman" if shutil.which("podman") else "docker")
+
+    def launch(self, vm_name, specs, cloud_init, quiet=False):
+        subprocess.run([self.engine, "run", "-d",
+                        "--name", vm_name,
+                        "--hostname", vm_name,
+                        "--cpus", str(specs["cpus"]),
+                        "--memory", str(specs["memory"]).lower(),
+                        f"docker.io/library/ubuntu:{specs['os']}",
+                        "sleep", "infinity"], check=True, capture_output=quiet, text=True)
+        # The image has no 'ubuntu' user or home, which the runcmd of our crates expects
+        with span("cloud_init_render", vm=vm_name, backend=self.name):
+            script = "mkdir -p /home/ubuntu\n" + setup_script(cloud_init)
+        subprocess.run([self.engine, "exec", "-i", vm_name, "bash", "-s"], input=script,
+                       check=True, capture_output=quiet, text=True)
+
+    def run(self, vm_name, args):
+        result = subprocess.run([self.engine, "exec", vm_name, *args], capture_output=True, text=True)
+        return result.stdout if result.returncode == 0 else None
+
+    def shell_command(self, vm_name):
+        return f"{self.engine} exec -it {vm_name} bash"
+
+class DryRunBackend:
+    """Records what would be run and simulates timings, without a hypervisor.
+
+    Every launch appends (vm_name, commands, simulated seconds) to
+    self.launches, and to log_file as a JSON line if one is given; with
+    sleep=True the simulated time is actually waited, so schedulers and
+    launch paths can be benchmarked realistically.
+    """
+
+    name = "dry-run"
+
+    def __init__(self, boot_seconds=20.0, seconds_per_package=3.0, sleep=False, log_file=None):
+        self.boot_seconds = boot_seconds
+        self.seconds_per_package = seconds_per_package
+        self.sleep = sleep
+        self.log_file = log_file
+        self.launches = []
+        self._lock = threading.Lock()
+
+    def launch(self, vm_name, specs, cloud_init, quiet=False):
+        commands = [["multipass", "launch", "--name", vm_name, "--cpus", str(specs["cpus"]),
+                     "--memory", specs["memory"], "--disk", specs["disk"], specs["os"]]]
+        commands.extend(["bash", "-c", line] for line in setup_script(cloud_init).splitlines())
+        seconds = self.boot_seconds + self.seconds_per_package * len(cloud_init.get("packages", []))
+        with self._lock:
+            self.launches.append((vm_name, commands, seconds))
+            if self.log_file:
+                with open(self.log_file, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"vm": vm_name, "commands": commands, "seconds": seconds}) + "\n")
+        if not quiet:
+            print(f"[dry-run] {vm_name}: {len(commands)} commands, ~{seconds:.0f}s simulated")
+        if self.sleep:
+            time.sleep(seconds)
+
+    def run(self, vm_name, args):
+        return None
+
+    def shell_command(self, vm_name):
+        return f"(dry run, no {vm_name} was created)"
+
+register_backend("multipass", MultipassBackend)
+register_backend("container", ContainerBackend)
+register_backend("podman", lambda: ContainerBackend("podman"))
+register_backend("docker", lambda: ContainerBackend("docker"))
+def shared_dry_run():
+    """The one DryRunBackend of this process, so its launches can be read back after a run.
+
+    Configured from $VM_DRY_RUN_SLEEP (1 to wait the simulated time) and
+    $VM_DRY_RUN_LOG (JSON lines file of every launch).
+    """
+    global _dry_run
+    with _dry_run_lock:
+        if _dry_run is None:
+            _dry_run = DryRunBackend(sleep=os.environ.get("VM_DRY_RUN_SLEEP", "") not in ("", "0"),
+                                     log_file=os.environ.get("VM_DRY_RUN_LOG") or None)
+    return _dry_run
+
+_dry_run = None
+_dry_run_lock = threading.Lock()
+
+register_backend("dry-run", shared_dry_run)
@@ -0,0 +1,46 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from http_cache import CACHE_DIR
+
+# Scan results of every file ever seen, keyed by its git blob SHA
+SCAN_DB = os.path.join(CACHE_DIR, "scan_cache.sqlite")
+# Bump when the scanners change so stale results are not reused
+SCANNER_VERSION = 2
+
+_local = threading.local()
+
+def git_blob_sha(data):
+    """The SHA git (and the GitHub API) uses for a file with these bytes."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+def scan_key(path, blob_sha):
+    """Cache key: the same blob can yield different results as a README or under another extension."""
+    name = os.path.basename(path)
+    kind = f"{os.path.splitext(name)[1].lower()}{'+readme' if 'README' in name.upper() else ''}"
+    return f"{blob_sha}:{kind}:{SCANNER_VERSION}"
+
+def _connect():
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        conn = sqlite3.connect(SCAN_DB, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS scans (key TEXT PRIMARY KEY, requirements TEXT, scanned_at REAL)")
+        _local.conn = conn
+    return conn
+
+def get_scan(key):
+    """Requirements found in this blob before, or None if it was never scanned."""
+    row = _connect().execute("SELECT requirements FROM scans WHERE key = ?", (key,)).fetchone()
+    return json.loads(row[0]) if row else None
+
+def put_scan(key, requirements):
+    conn = _connect()
+    conn.execute("INSERT OR REPLACE INTO scans VALUES (?, ?, ?)",
+                 (key, json.dumps(sorted(requirements)), time.time()))
+    conn.commit()
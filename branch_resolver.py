@@ -0,0 +1,99 @@
+import json
+import os
+import subprocess
+import threading
+import time
+
+from http_cache import CACHE_DIR, cached_get
+from http_client import github_token
+
+# Resolved default branches survive between runs in this file
+BRANCH_FILE = os.path.join(CACHE_DIR, "default_branches.json")
+BRANCH_TTL = 7 * 24 * 3600
+# Repos that could not be resolved are not asked again for this long
+FAILED_TTL = 24 * 3600
+# Only probed when the GitHub API cannot tell us the default branch
+FALLBACK_BRANCHES = ["main", "master", "develop"]
+
+_memo = None
+_lock = threading.Lock()
+# Until when (epoch) the REST API quota is spent
+_api_blocked_until = 0.0
+
+def repo_slug(repo):
+    """Turns 'https://github.com/owner/repo(.git)' or 'owner/repo' into 'owner/repo'."""
+    parts = repo.strip().rstrip("/").split("/")
+    return f"{parts[-2]}/{parts[-1]}".replace(".git", "")
+
+def _load():
+    global _memo
+    if _memo is None:
+        try:
+            with open(BRANCH_FILE, "r", encoding="utf-8") as f:
+                _memo = json.load(f)
+        except (OSError, ValueError):
+            _memo = {}
+    return _memo
+
+def _save(memo):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = f"{BRANCH_FILE}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(memo, f, indent=2)
+    os.replace(tmp, BRANCH_FILE)
+
+def _api_branch(slug):
+    """Default branch from the REST API, or None; never waits for the API quota."""
+    global _api_blocked_until
+    if not github_token() or time.time() < _api_blocked_until:
+        return None  # 60 calls/hour unauthenticated, or spent: not worth stalling for
+    try:
+        res = cached_get(f"https://api.github.com/repos/{slug}", timeout=5)
+    except Exception:
+        return None
+    if res.headers.get("X-RateLimit-Remaining") == "0":
+        try:
+            _api_blocked_until = float(res.headers.get("X-RateLimit-Reset", 0))
+        except ValueError:
+            _api_blocked_until = time.time() + 3600
+    return res.json().get("default_branch") if res.status_code == 200 else None
+
+def _ls_remote_branch(slug):
+    """Default branch from git's smart HTTP protocol, which has no API quota."""
+    try:
+        out = subprocess.run(["git", "ls-remote", "--symref", f"https://github.com/{slug}", "HEAD"],
+                             capture_output=True, text=True, timeout=15,
+                             env={**os.environ, "GIT_TERMINAL_PROMPT": "0"}).stdout
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    for line in out.splitlines():
+        if line.startswith("ref: refs/heads/") and line.endswith("\tHEAD"):
+            return line[len("ref: refs/heads/"):-len("\tHEAD")]
+    return None
+
+def resolve_default_branch(repo):
+    """Returns the default branch of a GitHub repo, or None if it cannot be resolved.
+
+    Asks the REST API when a token is set and its quota lasts, else
+    `git ls-remote`. The API call has no part in the raw-file limiter, so an
+    exhausted API quota never pauses the harvest. Results, failures
+    included (for FAILED_TTL), are memoized in process and in BRANCH_FILE.
+    """
+    slug = repo_slug(repo)
+    with _lock:
+        entry = _load().get(slug)
+    if entry and time.time() - entry["resolved_at"] < (BRANCH_TTL if entry["branch"] else FAILED_TTL):
+        return entry["branch"]
+
+    branch = _api_branch(slug) or _ls_remote_branch(slug)
+
+    with _lock:
+        memo = _load()
+        memo[slug] = {"branch": branch, "resolved_at": time.time()}
+        _save(memo)
+    return branch
+
+def candidate_branches(repo):
+    """Branches worth probing for raw files: the real default, else the usual guesses."""
+    branch = resolve_default_branch(repo)
+    return [branch] if branch else FALLBACK_BRANCHES
@@ -1,9 +1,21 @@
-import requests
+import os
 import json
-import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import http_client
+from branch_resolver import candidate_branches
+from http_cache import cached_get
+from jsonld_contexts import normalize_record
+from metadata_store import STORE_DB, connect, upsert
+from ratelimit import TokenBucket
+from repo_manifest import changed_repos, fetch_heads, load_manifest, record_head, save_manifest
 
 # The official data dump URL for CLARIAH tools
 DATA_URL = "https://tools.clariah.nl/data.json"
+# Append-only record of every harvested repo, compacted into OUTPUT_FILE at the end
+CHECKPOINT_FILE = "clariah_codemeta_harvest.jsonl"
+OUTPUT_FILE = "clariah_codemeta_final.json"
 
 def get_repos_from_clariah_data():
     """Fetches the official data.json and extracts GitHub repositories."""
@@ -11,7 +23,7 @@ def get_repos_from_clariah_data():
     try:
         # We add a header to specifically ask for JSON-LD, though data.json should be direct
         headers = {"Accept": "application/ld+json"}
-        response = requests.get(DATA_URL, headers=headers, timeout=20)
+        response = http_client.get(DATA_URL, headers=headers, timeout=20)
         response.raise_for_status()
         data = response.json()
     except Exception as e:
@@ -26,9 +38,9 @@ def get_repos_from_clariah_data():
         items = data
     
     for item in items:
-        # We are looking for 'codeRepository'
-        # In JSON-LD, keys might be prefixed (e.g., 'schema:codeRepository')
-        repo_url = item.get('codeRepository') or item.get('schema:codeRepository')
+        # We are looking for 'codeRepository'; prefixed keys (e.g., 'schema:codeRepository')
+        # are mapped to it by the normalization
+        repo_url = normalize_record(item).get('codeRepository')
         
         if repo_url and "github.com" in str(repo_url):
             # Clean up the URL to get 'owner/repo'
@@ -41,48 +53,173 @@ def get_repos_from_clariah_data():
 
     return list(github_repos)
 
-def fetch_codemeta(repo_path):
-    """Fetches the codemeta.json file from GitHub."""
-    # We check the most common branches
-    branches = ['main', 'master', 'develop']
-    
-    for branch in branches:
+class FetchError(Exception):
+    """A codemeta.json could not be fetched (network error, rate limit, 5xx); worth retrying later."""
+
+def _rate_limited(res):
+    # Secondary limits carry Retry-After, the primary one an exhausted X-RateLimit-Remaining
+    return res.status_code == 429 or (res.status_code == 403 and (
+        "Retry-After" in res.headers or res.headers.get("X-RateLimit-Remaining") == "0"))
+
+def fetch_codemeta(repo_path, limiter=None, max_retries=3):
+    """Fetches the codemeta.json file from GitHub.
+
+    If a TokenBucket is given, every request waits for a token and feeds the
+    response headers back, so 429/403 rate-limit answers pause all workers.
+    Returns None when no branch has a codemeta.json (404), and raises
+    FetchError when it could not be found out.
+    """
+    # Only the repo's real default branch, unless it cannot be resolved
+    for branch in candidate_branches(repo_path):
         raw_url = f"https://raw.githubusercontent.com/{repo_path}/{branch}/codemeta.json"
-        try:
-            res = requests.get(raw_url, timeout=5)
-            if res.status_code == 200:
-                print(f"[FOUND] {repo_path}")
-                return res.json()
-        except:
-            continue
-            
+        for _ in range(max_retries):
+            try:
+                res = cached_get(raw_url, timeout=5, limiter=limiter)
+            except Exception as e:
+                raise FetchError(f"{raw_url}: {e}") from e
+            if _rate_limited(res):
+                continue  # The limiter is paused now, try the same branch again
+            break
+        else:
+            raise FetchError(f"{raw_url}: still rate limited after {max_retries} attempts")
+
+        if res.status_code == 200:
+            try:
+                data = res.json()
+            except ValueError:
+                break  # Not a usable codemeta.json, same as having none
+            print(f"[FOUND] {repo_path}")
+            # Stored with canonical keys, so downstream code never sees prefixed ones
+            return normalize_record(data)
+        if res.status_code != 404:
+            raise FetchError(f"{raw_url}: HTTP {res.status_code}")
+
     print(f"[MISSING] {repo_path}")
     return None
 
-def main():
+def harvest(repos, workers=8, rate=10.0):
+    """Fetches codemeta.json for all repos using a bounded thread pool.
+
+    workers caps the number of requests in flight, rate caps the number of
+    requests started per second (lowered automatically from GitHub headers).
+    Yields (repo, codemeta or None, error or None) as soon as each repo
+    finishes; a repo without codemeta.json has neither codemeta nor error.
+    """
+    limiter = TokenBucket(rate=rate, capacity=max(workers, 1))
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(fetch_codemeta, repo, limiter): repo for repo in repos}
+        for i, future in enumerate(as_completed(futures), start=1):
+            try:
+                yield futures[future], future.result(), None
+            except FetchError as e:
+                print(f"[FAILED] {futures[future]}: {e}")
+                yield futures[future], None, str(e)
+            # Progress indicator
+            if i % 10 == 0:
+                print(f"--- Processed {i}/{len(repos)} repositories ---")
+
+def read_checkpoint(jsonl_file):
+    """Yields the records of a harvest JSONL file, skipping a torn last line."""
+    if not os.path.exists(jsonl_file):
+        return
+    with open(jsonl_file, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue  # Partially written line from an interrupted run
+
+def compact(jsonl_file, output_file):
+    """Rewrites the JSONL records as the {repo: codemeta} JSON document report.py expects.
+
+    Entries are written one at a time, so memory does not grow with the corpus.
+    """
+    seen = set()
+    with open(output_file, "w", encoding="utf-8") as out:
+        out.write("{")
+        for record in read_checkpoint(jsonl_file):
+            if record["codemeta"] is None or record["repo"] in seen:
+                continue
+            out.write("," if seen else "")
+            seen.add(record["repo"])
+            # Same layout as json.dump(results, f, indent=4)
+            body = json.dumps(record["codemeta"], indent=4).replace("\n", "\n    ")
+            out.write(f"\n    {json.dumps(record['repo'])}: {body}")
+        out.write("\n}" if seen else "}")
+    return len(seen)
+
+def carry_over(jsonl_file, keep):
+    """Rewrites the JSONL keeping only records of repos in keep; returns the kept repos."""
+    kept = set()
+    tmp = f"{jsonl_file}.tmp"
+    with open(tmp, "w", encoding="utf-8") as out:
+        for record in read_checkpoint(jsonl_file):
+            # Failed fetches are never carried over, so they are harvested again
+            if record["repo"] in keep and record["repo"] not in kept and "error" not in record:
+                kept.add(record["repo"])
+                out.write(json.dumps(record) + "\n")
+    os.replace(tmp, jsonl_file)
+    return kept
+
+def main(workers=8, rate=10.0, resume=False, incremental=False, store=None):
     repos = get_repos_from_clariah_data()
     print(f"Successfully identified {len(repos)} GitHub repositories.\n")
-    
-    results = {}
-    
-    for i, repo in enumerate(repos):
-        # Progress indicator
-        if i % 10 == 0 and i > 0:
-            print(f"--- Processed {i}/{len(repos)} repositories ---")
-            
-        data = fetch_codemeta(repo)
-        if data:
-            results[repo] = data
-        
-        # Polite delay to prevent GitHub rate limiting
-        time.sleep(0.3)
+
+    heads = None
+    if resume:
+        # Repos that failed last time (error marker) are queued again
+        done = {record["repo"] for record in read_checkpoint(CHECKPOINT_FILE) if "error" not in record}
+        repos = [repo for repo in repos if repo not in done]
+        print(f"Resuming: {len(done)} repositories already harvested, {len(repos)} to go.\n")
+    elif incremental:
+        # Only repos whose HEAD moved since the last run are fetched again
+        manifest = load_manifest()
+        heads = fetch_heads(repos, workers=workers)
+        changed = set(changed_repos(repos, manifest, heads))
+        kept = carry_over(CHECKPOINT_FILE, set(repos) - changed)
+        repos = [repo for repo in repos if repo not in kept]
+        print(f"Incremental: {len(kept)} repositories unchanged, {len(repos)} to harvest.\n")
+    elif os.path.exists(CHECKPOINT_FILE):
+        os.remove(CHECKPOINT_FILE)
+
+    # Searchable copy of the records, updated as each repo arrives
+    conn = connect(store) if store else None
+
+    # Every finished repo is appended immediately, so a crash loses nothing
+    with open(CHECKPOINT_FILE, "a", encoding="utf-8") as checkpoint:
+        for repo, data, error in harvest(repos, workers=workers, rate=rate):
+            record = {"repo": repo, "codemeta": data}
+            if error is not None:
+                record["error"] = error
+            checkpoint.write(json.dumps(record) + "\n")
+            checkpoint.flush()
+            if conn is not None and isinstance(data, dict):
+                upsert(conn, repo, data)
+                conn.commit()
+            # A failed fetch leaves the old head, so the next run tries the repo again
+            if heads is not None and repo in heads and error is None:
+                record_head(manifest, repo, heads[repo])
+
+    if heads is not None:
+        save_manifest(manifest)
+    if conn is not None:
+        conn.close()
 
     # Output to file
-    output_file = "clariah_codemeta_final.json"
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(results, f, indent=4)
+    count = compact(CHECKPOINT_FILE, OUTPUT_FILE)
     
-    print(f"\nFinished! Extracted {len(results)} files to {output_file}.")
+    print(f"\nFinished! Extracted {count} files to {OUTPUT_FILE}.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Harvest codemeta.json files of CLARIAH tools.")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent requests (1 = sequential)")
+    parser.add_argument("--rate", type=float, default=10.0, help="Maximum requests per second")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--resume", action="store_true", help=f"Skip repositories already in {CHECKPOINT_FILE}")
+    mode.add_argument("--incremental", action="store_true", help="Only re-harvest repositories whose HEAD commit changed")
+    parser.add_argument("--store", nargs="?", const=STORE_DB, metavar="DB",
+                        help=f"Also index records in a searchable SQLite store (default {STORE_DB})")
+    args = parser.parse_args()
+    main(workers=args.workers, rate=args.rate, resume=args.resume, incremental=args.incremental,
+         store=args.store)
\ No newline at end of file
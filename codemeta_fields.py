@@ -0,0 +1,53 @@
+def names(value):
+    """Flattens a CodeMeta property to a list of plain strings.
+
+    Harvested records mix "Python", ["Python 3"] and
+    {"@type": "ComputerLanguage", "name": "Python"}; all become ["Python"].
+    """
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return [n for item in value for n in names(item)]
+    if isinstance(value, dict):
+        label = value.get("name") or value.get("identifier") or value.get("@id") or value.get("url")
+        return names(label) if label else []
+    text = str(value).strip()
+    return [text] if text else []
+
+def iter_strings(data):
+    """Yields every string value in a JSON document (explicit stack, no recursion)."""
+    stack = [data]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            stack.extend(reversed(list(item.values())))
+        elif isinstance(item, list):
+            stack.extend(reversed(item))
+        elif isinstance(item, str):
+            yield item
+
+def orcids(record):
+    """ORCID iDs mentioned anywhere in a record, in order of appearance."""
+    found = []
+    for value in iter_strings(record):
+        if "orcid.org" in value and value not in found:
+            found.append(value)
+    return found
+
+def authors(record):
+    """(display name, ORCID or None) for every author/contributor of a record."""
+    people = []
+    for key in ("author", "contributor", "maintainer"):
+        value = record.get(key)
+        for person in value if isinstance(value, list) else [value]:
+            if not isinstance(person, dict):
+                if isinstance(person, str) and person.strip():
+                    people.append((person.strip(), None))
+                continue
+            full = " ".join(p for p in (person.get("givenName"), person.get("familyName")) if isinstance(p, str))
+            name = full or next(iter(names(person.get("name"))), None)
+            orcid = next((v for v in (person.get("@id"), person.get("identifier"))
+                          if isinstance(v, str) and "orcid.org" in v), None)
+            if name or orcid:
+                people.append((name, orcid))
+    return people
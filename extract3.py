@@ -1,13 +1,14 @@
-import requests
 import re
 import yaml
 
+import http_client
+
 def generate_requirements_and_ansible():
     # Verified URL from the repository
     url = "https://github.com/rug-compling/Alpino/raw/refs/heads/master/README.md"
     
     try:
-        response = requests.get(url, timeout=10)
+        response = http_client.get(url, timeout=10)
         response.raise_for_status()
         content = response.text
     except Exception as e:
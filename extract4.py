@@ -1,31 +1,49 @@
 import json
 import yaml
-import subprocess
-import os
-import requests
 import base64
-import re
+
+from backends import launch
+from http_cache import cached_get
+from local_source import LocalRepo, is_local_source
+from python_imports import parse_requirements
+from timing import span, timed, timed_command
+
+def _read_api_file(api_url, name):
+    resp = cached_get(f"{api_url}{name}")
+    if resp.status_code == 200:
+        return base64.b64decode(resp.json()['content']).decode('utf-8')
+    return None
 
 def extract_github_requirements(repo_url):
-    """Scans a GitHub repo for dependencies and OS hints via API."""
-    # Parse owner and repo name from URL
-    parts = repo_url.strip("/").split("/")
-    owner, repo = parts[-2], parts[-1].replace(".git", "")
-    
-    api_url = f"https://api.github.com/repos/{owner}/{repo}/contents/"
-    response = requests.get(api_url)
+    """Scans a GitHub repo for dependencies and OS hints via API.
+
+    repo_url may also be a local checkout or bare git repository, which is
+    read from disk without any network access.
+    """
+    if is_local_source(repo_url):
+        local = LocalRepo(repo_url)
+        repo = local.name
+        files = local.list_files(recursive=False)
+        read = local.read
+    else:
+        # Parse owner and repo name from URL
+        parts = repo_url.strip("/").split("/")
+        owner, repo = parts[-2], parts[-1].replace(".git", "")
+
+        api_url = f"https://api.github.com/repos/{owner}/{repo}/contents/"
+        response = cached_get(api_url)
+        files = [f['name'] for f in response.json()] if response.status_code == 200 else []
+        read = lambda name: _read_api_file(api_url, name)
     
     found_deps = ["git"] # Git is required to clone the repo in the VM
     detected_os = "22.04" # Default Ubuntu version
+    packages = [] # PyPI distributions from requirements.txt
 
-    if response.status_code == 200:
-        files = [f['name'] for f in response.json()]
-
+    if files:
         # 1. Detect OS/Environment from Dockerfile
         if "Dockerfile" in files:
-            d_resp = requests.get(f"{api_url}Dockerfile")
-            if d_resp.status_code == 200:
-                content = base64.b64decode(d_resp.json()['content']).decode('utf-8')
+            content = read("Dockerfile")
+            if content is not None:
                 if "ubuntu" in content.lower():
                     detected_os = "22.04"
                 elif "alpine" in content.lower():
@@ -33,20 +51,20 @@ def extract_github_requirements(repo_url):
 
         # 2. Detect Python Dependencies
         if "requirements.txt" in files:
-            r_resp = requests.get(f"{api_url}requirements.txt")
-            if r_resp.status_code == 200:
-                content = base64.b64decode(r_resp.json()['content']).decode('utf-8')
-                # Filter for package names only (simple regex)
+            content = read("requirements.txt")
+            if content is not None:
                 found_deps.extend(["python3-pip"])
-                packages = re.findall(r'^([a-zA-Z0-9\-_]+)', content, re.MULTILINE)
-                # Note: These are for system packages. For python-specific libs, 
-                # we will use pip inside the VM's runcmd.
+                # Note: These are not system packages; pip installs them inside
+                # the VM's runcmd. They are kept in the crate as metadata.
+                packages = parse_requirements(content)
 
-    return found_deps, detected_os, repo
+    return found_deps, detected_os, repo, packages
 
+@timed("crate_generation")
 def generate_ro_crate(output_yaml, repo_url):
     """Converts GitHub metadata to RO-Crate YAML."""
-    deps, os_version, repo_name = extract_github_requirements(repo_url)
+    with span("metadata_fetch", input=repo_url):
+        deps, os_version, repo_name, packages = extract_github_requirements(repo_url)
 
     ro_crate_data = {
         "@context": "https://w3id.org/ro/crate/1.1/context",
@@ -73,6 +91,8 @@ def generate_ro_crate(output_yaml, repo_url):
             }
         ]
     }
+    if packages:
+        ro_crate_data["@graph"][1]["softwareRequirements"] = packages
 
     with open(output_yaml, 'w') as f:
         yaml.dump(ro_crate_data, f, sort_keys=False, default_flow_style=False)
@@ -80,8 +100,11 @@ def generate_ro_crate(output_yaml, repo_url):
     print(f"✅ Generated RO-Crate for: {repo_name}")
     return ro_crate_data
 
-def launch_vm_with_repo(crate_data):
-    """Creates Cloud-init config and clones the repo inside the VM."""
+def launch_vm_with_repo(crate_data, golden=False, backend=None):
+    """Creates Cloud-init config and clones the repo inside the VM (multipass unless another backend is given).
+
+    golden and backend are passed to backends.launch().
+    """
     main_node = next(n for n in crate_data["@graph"] if n["@id"] == "./")
     specs = main_node["virtualization"]
     deps = main_node["dependencies"]
@@ -94,33 +117,14 @@ def launch_vm_with_repo(crate_data):
         "package_update": True,
         "packages": deps,
         "runcmd": [
-            f"git clone {repo_url} /home/ubuntu/{repo_name}",
-            f"cd /home/ubuntu/{repo_name} && if [ -f requirements.txt ]; then pip3 install -r requirements.txt; fi"
+            timed_command("git_clone", f"git clone {repo_url} /home/ubuntu/{repo_name}"),
+            timed_command("pip_install", f"cd /home/ubuntu/{repo_name} && if [ -f requirements.txt ]; then pip3 install -r requirements.txt; fi")
         ]
     }
-    
-    with open("init.yaml", "w") as f:
-        yaml.dump(cloud_init, f)
-
-    print(f"🚀 Launching VM '{vm_name}' with automated setup...")
-
-    cmd = [
-        "multipass", "launch",
-        "--name", vm_name,
-        "--cpus", str(specs["cpus"]),
-        "--memory", specs["memory"],
-        "--disk", specs["disk"],
-        "--cloud-init", "init.yaml",
-        specs["os"]
-    ]
-	
-    try:
-        subprocess.run(cmd, check=True)
-        print(f"✨ Success! Code cloned to /home/ubuntu/{repo_name}")
-        print(f"👉 Access VM: multipass shell {vm_name}")
-    finally:
-        if os.path.exists("init.yaml"):
-            os.remove("init.yaml")
+
+    backend = launch(vm_name, specs, deps, cloud_init, golden=golden, backend=backend)
+    print(f"✨ Success! Code cloned to /home/ubuntu/{repo_name}")
+    print(f"👉 Access VM: {backend.shell_command(vm_name)}")
 
 if __name__ == "__main__":
     REPO = "https://github.com/rug-compling/Alpino.git"
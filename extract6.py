@@ -1,13 +1,26 @@
 import requests
 import yaml
 import re
+import os
+import csv
 import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 
-def fetch_raw(repo_url, filename):
+from branch_resolver import candidate_branches, repo_slug
+from http_cache import cached_get
+from local_source import LocalRepo, is_local_source
+from package_cache import ansible_cache_tasks
+from repo_manifest import changed_repos, fetch_heads, load_manifest, record_head, save_manifest
+
+# Per-batch record of the HEAD each playbook was generated from
+PLAYBOOK_MANIFEST = "playbook_manifest.json"
+
+def fetch_raw(repo_url, filename, branches=None):
     base = repo_url.replace(".git", "").replace("github.com", "raw.githubusercontent.com").rstrip("/")
-    for branch in ["main", "master", "develop"]:
+    for branch in branches or candidate_branches(repo_url):
         try:
-            r = requests.get(f"{base}/{branch}/{filename}", timeout=5) # Added timeout
+            r = cached_get(f"{base}/{branch}/{filename}", timeout=5) # Added timeout
             if r.status_code == 200: 
                 return r.text
         except requests.exceptions.ConnectionError:
@@ -17,45 +30,107 @@ def fetch_raw(repo_url, filename):
             print(f"Skipping {filename} on {branch} due to error: {e}")
     return None
 
-def parse_repo(repo_url):
+# --- Manifest handlers: each one updates the results dict from a file's content ---
+
+def _codemeta(results, content):
+    data = json.loads(content)
+    if not isinstance(data, dict):
+        raise ValueError(f"expected a JSON object, got {type(data).__name__}")
+    for field in ["programmingLanguage", "softwareRequirements"]:
+        items = data.get(field, [])
+        if not isinstance(items, list): items = [items]
+        results["system"].update([str(i) for i in items])
+
+def _maven(results, content):
+    results["maven"] = True
+    results["system"].update(["maven", "openjdk-11-jdk"])
+
+def _pip(results, content):
+    results["pip"] = True
+    results["system"].add("python3-pip")
+
+def _python_package(results, content):
+    results["python_package"] = True
+    results["system"].add("python3-pip")
+
+def _conda(results, content):
+    results["conda"] = True
+
+def _npm(results, content):
+    results["npm"] = True
+    results["system"].add("nodejs")
+
+def _r_package(results, content):
+    results["system"].update(["r-base", "r-base-dev"])
+
+def _cargo(results, content):
+    results["cargo"] = True
+    results["system"].add("cargo")
+
+def _docker(results, content):
+    results["system"].add("docker.io")
+
+# Add a (filename, handler) pair here to detect another manifest
+MANIFESTS = [
+    ("codemeta.json", _codemeta),
+    ("pom.xml", _maven),
+    ("requirements.txt", _pip),
+    ("setup.py", _python_package),
+    ("pyproject.toml", _python_package),
+    ("environment.yml", _conda),
+    ("package.json", _npm),
+    ("DESCRIPTION", _r_package),
+    ("Cargo.toml", _cargo),
+    ("Dockerfile", _docker),
+]
+
+def parse_repo(repo_url, pool=None):
+    """Detects the manifests of a repo; pool is an executor shared by a batch for the manifest fetches.
+
+    Without one, a private pool probes all manifests of this repo at once.
+    """
     results = {
         "system": set(),
         "pip": False,
+        "python_package": False,
         "conda": False,
         "npm": False,
-        "maven": False
+        "maven": False,
+        "cargo": False
     }
 
-    # 1. codemeta.json
-    cm = fetch_raw(repo_url, "codemeta.json")
-    if cm:
-        data = json.loads(cm)
-        for field in ["programmingLanguage", "softwareRequirements"]:
-            items = data.get(field, [])
-            if not isinstance(items, list): items = [items]
-            results["system"].update([str(i) for i in items])
-
-    # 2. Check for Manifest Files & Set Flags
-    if fetch_raw(repo_url, "pom.xml"):
-        results["maven"] = True
-        results["system"].update(["maven", "openjdk-11-jdk"])
-    
-    if fetch_raw(repo_url, "requirements.txt"):
-        results["pip"] = True
-        results["system"].add("python3-pip")
+    if is_local_source(repo_url):
+        # Local checkout or bare repo: plain file reads, no network
+        local = LocalRepo(repo_url)
+        found = [(m, local.read(m[0])) for m in MANIFESTS]
+    else:
+        # Resolve the branch once, then probe every manifest at the same time
+        branches = candidate_branches(repo_url)
+        fetch = lambda m: fetch_raw(repo_url, m[0], branches)
+        if pool is None:
+            with ThreadPoolExecutor(max_workers=len(MANIFESTS)) as own_pool:
+                found = list(zip(MANIFESTS, own_pool.map(fetch, MANIFESTS)))
+        else:
+            found = list(zip(MANIFESTS, pool.map(fetch, MANIFESTS)))
 
-    if fetch_raw(repo_url, "package.json"):
-        results["npm"] = True
-        results["system"].add("nodejs")
+    # Handlers run in MANIFESTS order so the result does not depend on timing
+    for (filename, handler), content in found:
+        if content is None:
+            continue
+        try:
+            handler(results, content)
+        except ValueError as e:
+            print(f"Could not parse {filename}: {e}")
 
     return results
 
-def create_ansible(repo_url):
-    deps = parse_repo(repo_url)
-    repo_name = repo_url.split("/")[-1].replace(".git", "")
+def build_playbook(repo_url, deps):
+    """Returns the Ansible playbook (a plain list) for a repo and its parse_repo() result."""
+    repo_name = repo_url.rstrip("/").split("/")[-1].replace(".git", "")
     dest_path = f"/opt/{repo_name}"
     
-    tasks = []
+    # 0. Route apt/pip/npm/Maven downloads through the host package cache, if one runs
+    tasks = ansible_cache_tasks()
 
     # 1. System Prep
     tasks.append({"name": "Update apt cache", "apt": {"update_cache": "yes"}, "when": "ansible_os_family == 'Debian'"})
@@ -76,7 +151,7 @@ def create_ansible(repo_url):
     if deps["system"]:
         tasks.append({
             "name": "Install Runtimes and Tools",
-            "package": {"name": list(deps["system"]), "state": "present"},
+            "package": {"name": sorted(deps["system"]), "state": "present"},
             "ignore_errors": True
         })
 
@@ -87,6 +162,12 @@ def create_ansible(repo_url):
             "pip": {"requirements": f"{dest_path}/requirements.txt"}
         })
 
+    if deps["python_package"]:
+        tasks.append({
+            "name": "Install Python package",
+            "pip": {"name": dest_path}
+        })
+
     if deps["maven"]:
         tasks.append({
             "name": "Build Java Project with Maven",
@@ -100,16 +181,145 @@ def create_ansible(repo_url):
             "npm": {"path": dest_path, "state": "present"}
         })
 
+    if deps["cargo"]:
+        tasks.append({
+            "name": "Build Rust project with Cargo",
+            "command": "cargo build --release",
+            "args": {"chdir": dest_path}
+        })
+
     playbook = [{"name": f"End-to-End Deployment for {repo_name}", "hosts": "localhost", "become": True, "tasks": tasks}]
-    
-    with open('deploy_everything.yml', 'w') as f:
+    return playbook
+
+def write_playbook(playbook, output_file):
+    with open(output_file, 'w') as f:
         yaml.dump(playbook, f, sort_keys=False, default_flow_style=False)
+    return output_file
+
+def create_ansible(repo_url, output_file="deploy_everything.yml"):
+    deps = parse_repo(repo_url)
+    repo_name = repo_url.rstrip("/").split("/")[-1].replace(".git", "")
+    write_playbook(build_playbook(repo_url, deps), output_file)
     
-    print(f"Playbook 'deploy_everything.yml' generated for {repo_name}.")
+    print(f"Playbook '{output_file}' generated for {repo_name}.")
+
+# --- Batch mode: one playbook per harvested repository ---
+
+def load_repo_urls(source):
+    """Reads GitHub repo URLs from clariah_codemeta_final.json or codemeta_git_report.csv."""
+    urls = []
+    if source.endswith(".json"):
+        with open(source, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        for key, cm in data.items():
+            repo = cm.get("codeRepository") if isinstance(cm, dict) else None
+            urls.append(repo if isinstance(repo, str) and "github.com" in repo else f"https://github.com/{key}")
+    else:
+        with open(source, "r", encoding="utf-8", newline="") as f:
+            urls = [row["GitHub Repository"] for row in csv.DictReader(f) if row.get("GitHub Repository")]
+
+    # Reduce links like .../owner/repo/issues to https://github.com/owner/repo, without duplicates
+    repos = {}
+    for url in urls:
+        match = re.search(r"github\.com/([^/\s]+)/([^/\s#?]+)", url)
+        if match:
+            owner, name = match.group(1), re.sub(r"\.git$", "", match.group(2))
+            repos.setdefault(f"{owner}/{name}".lower(), f"https://github.com/{owner}/{name}")
+    return list(repos.values())
+
+def playbook_names(repo_urls):
+    """deploy_everything_<repo>.yml, qualified with the owner when two repos share a name."""
+    def split(url):
+        owner, name = url.rstrip("/").split("/")[-2:]
+        return owner, name
+
+    counts = {}
+    for url in repo_urls:
+        name = split(url)[1].lower()
+        counts[name] = counts.get(name, 0) + 1
+
+    names = {}
+    for url in repo_urls:
+        owner, name = split(url)
+        label = name if counts[name.lower()] == 1 else f"{owner}_{name}"
+        names[url] = "deploy_everything_" + re.sub(r"[^A-Za-z0-9_.-]", "_", label) + ".yml"
+    return names
+
+def _render(job):
+    """Process-pool worker: builds and writes one playbook."""
+    repo_url, deps, output_file = job
+    return write_playbook(build_playbook(repo_url, deps), output_file)
+
+def create_ansible_batch(source, out_dir="playbooks", workers=8, processes=None, changed_only=False):
+    """Generates one playbook per repo listed in source.
+
+    Manifest probing is network bound: all repos share one thread pool of
+    size workers for their fetches, so at most workers requests are in
+    flight. YAML rendering runs in a process pool. With changed_only, repos whose
+    HEAD SHA matches the last batch run are skipped.
+    """
+    repo_urls = load_repo_urls(source)
+    names = playbook_names(repo_urls)
+    os.makedirs(out_dir, exist_ok=True)
+
+    manifest_file = os.path.join(out_dir, PLAYBOOK_MANIFEST)
+    manifest = load_manifest(manifest_file)
+    heads = {}
+    if changed_only:
+        heads = fetch_heads(repo_urls, workers=workers)
+        changed = set(changed_repos(repo_urls, manifest, heads))
+        repo_urls = [u for u in repo_urls
+                     if u in changed or not os.path.exists(os.path.join(out_dir, names[u]))]
+    print(f"Generating {len(repo_urls)} playbooks into {out_dir}/ ...")
+
+    summary = {"generated": [], "failed": {}}
+    jobs = []
+    # Repo workers only wait on the shared fetch pool, a separate pool so they cannot starve it
+    with ThreadPoolExecutor(max_workers=workers) as fetch_pool, ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(parse_repo, url, fetch_pool): url for url in repo_urls}
+        for future in as_completed(futures):
+            url = futures[future]
+            try:
+                jobs.append((url, future.result(), os.path.join(out_dir, names[url])))
+            except Exception as e:
+                summary["failed"][url] = f"parse_repo: {e}"
+
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = {pool.submit(_render, job): job[0] for job in jobs}
+        for future in as_completed(futures):
+            url = futures[future]
+            try:
+                summary["generated"].append(future.result())
+                if repo_slug(url) in heads:
+                    record_head(manifest, url, heads[repo_slug(url)])
+            except Exception as e:
+                summary["failed"][url] = f"render: {e}"
+
+    if changed_only:
+        save_manifest(manifest, manifest_file)
+
+    print(f"\nDone: {len(summary['generated'])} playbooks generated, {len(summary['failed'])} failed.")
+    for url, error in sorted(summary["failed"].items()):
+        print(f" ✗ {url}: {error}")
+    return summary
 
 #create_ansible("https://github.com/firmao/wimu") no codemeta.json
 #create_ansible("https://github.com/rug-compling/Alpino")
 #create_ansible("https://github.com/odissei-data/ODISSEI-code-library")
 #create_ansible("https://github.com/odissei-data/odissei-kg")
 if __name__ == "__main__":
-    create_ansible("https://github.com/odissei-data/odissei-kg")
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Generate Ansible playbooks from repository manifests.")
+    parser.add_argument("repo", nargs="?", default="https://github.com/odissei-data/odissei-kg",
+                        help="Repository URL or local path (single playbook mode)")
+    parser.add_argument("--batch", metavar="SOURCE",
+                        help="clariah_codemeta_final.json or codemeta_git_report.csv to generate one playbook per repo")
+    parser.add_argument("--out-dir", default="playbooks", help="Output directory in batch mode")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent repositories being probed")
+    parser.add_argument("--processes", type=int, default=None, help="Processes rendering YAML (default: CPU count)")
+    parser.add_argument("--changed-only", action="store_true", help="Skip repos whose HEAD did not change since the last batch")
+    args = parser.parse_args()
+
+    if args.batch:
+        create_ansible_batch(args.batch, args.out_dir, args.workers, args.processes, args.changed_only)
+    else:
+        create_ansible(args.repo)
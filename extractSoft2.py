@@ -1,13 +1,33 @@
-import requests
 import re
 
+import http_client
+from scanners import KeywordMatcher
+
+# 1. SOFTWARE EXTRACTION
+# We scan for the primary host tools and the guest environment tools
+SOFTWARE_TO_CHECK = {
+    "Host Orchestration": ["Multipass", "Snap", "Git"],
+    "VM Environment": ["Ubuntu", "Bash", "Python"],
+    "Application Layer": ["RO-Crate", "CodeMeta", "JSON-LD"]
+}
+# One matcher for the whole vocabulary, so the README is scanned once
+TOOL_MATCHER = KeywordMatcher([t for tools in SOFTWARE_TO_CHECK.values() for t in tools])
+
+# 2. RESOURCE ALLOCATION EXTRACTION
+# Looking for flags like --mem 2G, --cpus 2, --disk 5G
+RESOURCE_PATTERNS = {
+    "Memory (RAM)": re.compile(r"--mem\s+([\w\d]+)"),
+    "CPU Cores": re.compile(r"--cpus\s+(\d+)"),
+    "Disk Space": re.compile(r"--disk\s+([\w\d]+)")
+}
+
 def extract_requirements():
     # Using the exact verified URL
     url = "https://github.com/rug-compling/Alpino/raw/refs/heads/master/README.md"
     
     try:
         print(f"Connecting to: {url}")
-        response = requests.get(url, timeout=10)
+        response = http_client.get(url, timeout=10)
         response.raise_for_status()
         content = response.text
         print("Successfully read Readme.md\n")
@@ -15,31 +35,18 @@ def extract_requirements():
         print(f"Connection Error: {e}")
         return
 
-    # 1. SOFTWARE EXTRACTION
-    # We scan for the primary host tools and the guest environment tools
-    software_to_check = {
-        "Host Orchestration": ["Multipass", "Snap", "Git"],
-        "VM Environment": ["Ubuntu", "Bash", "Python"],
-        "Application Layer": ["RO-Crate", "CodeMeta", "JSON-LD"]
-    }
-
-    # 2. RESOURCE ALLOCATION EXTRACTION
-    # Looking for flags like --mem 2G, --cpus 2, --disk 5G
-    resources = {
-        "Memory (RAM)": re.search(r"--mem\s+([\w\d]+)", content),
-        "CPU Cores": re.search(r"--cpus\s+(\d+)", content),
-        "Disk Space": re.search(r"--disk\s+([\w\d]+)", content)
-    }
+    found = TOOL_MATCHER.find(content)
+    resources = {label: regex.search(content) for label, regex in RESOURCE_PATTERNS.items()}
 
     print("="*50)
     print("COMPLETE SOFTWARE & HARDWARE REQUIREMENTS")
     print("="*50)
 
     # Output Software
-    for category, tools in software_to_check.items():
+    for category, tools in SOFTWARE_TO_CHECK.items():
         print(f"\n[{category}]")
         for tool in tools:
-            if re.search(rf"\b{tool}\b", content, re.IGNORECASE):
+            if tool in found:
                 print(f" • {tool}")
 
     # Output System Resources
@@ -1,11 +1,24 @@
-import requests
+import os
 import re
 import base64
+import tarfile
+
+import http_client
+from blob_cache import get_scan, git_blob_sha, put_scan, scan_key
+from http_cache import cached_get
+from local_source import LocalRepo, is_local_source
+from scan_limits import MAX_FILE_BYTES, MAX_REPO_BYTES, LoadError, ScanBudget
+from scanners import scan_source
+
+# README prerequisite parsing, compiled once
+PREREQ_SECTION = re.compile(r"(?i)#+\s*(?:Prerequisites|Setup|Usage)(.*?)(?=\n#+|$)", re.DOTALL)
+BULLET_ITEM = re.compile(r"^[ \t]*[\*\-]\s+(.*)", re.MULTILINE)
+MARKDOWN_LINK = re.compile(r"\[(.*?)\]\(.*?\)")
 
 def get_repo_files(owner, repo, path=""):
     """Recursively gets all files in the repository."""
     api_url = f"https://api.github.com/repos/{owner}/{repo}/contents/{path}"
-    response = requests.get(api_url)
+    response = cached_get(api_url)
     if response.status_code != 200:
         return []
     
@@ -19,53 +32,134 @@ def get_repo_files(owner, repo, path=""):
     return files
 
 def extract_from_source(content, file_ext):
-    """Regex patterns to find dependencies in actual code."""
-    deps = []
-    if file_ext == '.py':
-        # Matches 'import package' or 'from package import ...'
-        deps = re.findall(r"^\s*(?:import|from)\s+([a-zA-Z0-9_]+)", content, re.MULTILINE)
-    elif file_ext in ['.r', '.R']:
-        # Matches 'library(package)' or 'require(package)'
-        deps = re.findall(r"(?:library|require)\(([a-zA-Z0-9\.]+)\)", content)
-    elif file_ext in ['.sh', '.bash']:
-        # Matches 'apt-get install package'
-        deps = re.findall(r"apt-get\s+install\s+(?:-y\s+)?([\w\-\s]+)", content)
-    return deps
-
-def analyze_full_repo(github_url):
-    match = re.search(r"github\.com/([^/]+)/([^/]+)", github_url)
-    if not match: return
-    owner, repo = match.groups()
-    repo = repo.replace(".git", "")
-
-    print(f"--- Deep Scanning Repository: {owner}/{repo} ---")
-    all_files = get_repo_files(owner, repo)
+    """Finds dependencies in actual code with the scanners registered for file_ext."""
+    return scan_source(content, file_ext)
+
+SCANNED_EXTENSIONS = ['.py', '.r', '.sh', '.json', '.md']
+
+def iter_archive_files(owner, repo, ref="", budget=None):
+    """Streams the repo tarball and yields (path, blob sha, load) for every scanned file.
+
+    One HTTP transfer per repo; members are read straight from the gzip
+    stream and nothing is extracted to disk. Members the budget rejects by
+    their header size are skipped without being buffered.
+    """
+    budget = budget or ScanBudget()
+    url = f"https://api.github.com/repos/{owner}/{repo}/tarball/{ref}".rstrip("/")
+    with http_client.get(url, stream=True, timeout=60) as response:
+        if response.status_code != 200:
+            print(f"Could not download archive ({response.status_code}).")
+            return
+        response.raw.decode_content = True
+        with tarfile.open(fileobj=response.raw, mode="r|gz") as archive:
+            for member in archive:
+                if not member.isfile():
+                    continue
+                if os.path.splitext(member.name)[1].lower() not in SCANNED_EXTENSIONS:
+                    continue
+                # Drop the '<owner>-<repo>-<sha>/' prefix GitHub puts on every member
+                path = member.name.split("/", 1)[-1]
+                if not budget.admit(path, member.size):
+                    continue
+                data = archive.extractfile(member).read()
+                yield path, git_blob_sha(data), lambda data=data: budget.accept(data)
+
+def _download(url, budget):
+    try:
+        response = cached_get(url)
+    except Exception as e:
+        raise LoadError(f"{url}: {e}") from e
+    if response.status_code != 200:
+        raise LoadError(f"{url}: HTTP {response.status_code}")
+    return budget.accept(response.content)
+
+def iter_api_files(owner, repo, budget=None):
+    """Yields (path, blob sha, load) for every scanned file.
+
+    The contents API reports each file's blob SHA, so load() only downloads
+    files whose scan result is not cached yet.
+    """
+    budget = budget or ScanBudget()
+    for file in get_repo_files(owner, repo):
+        if os.path.splitext(file['name'])[1].lower() not in SCANNED_EXTENSIONS:
+            continue
+        if not budget.admit(file['path'], file.get('size', 0)):
+            continue
+        yield file['path'], file['sha'], lambda url=file['download_url']: _download(url, budget)
+
+def scan_file(file_path, content, software_requirements):
+    """Adds README prerequisites and source-code dependencies of one file."""
+    file_name = os.path.basename(file_path)
+    file_ext = os.path.splitext(file_name)[1].lower()
+
+    # 1. Scan README for manual prerequisites
+    if 'README' in file_name.upper():
+        # Look for bullet points in Setup/Usage/Prerequisites
+        prereq_section = PREREQ_SECTION.search(content)
+        if prereq_section:
+            items = BULLET_ITEM.findall(prereq_section.group(1))
+            for i in items:
+                software_requirements.add(MARKDOWN_LINK.sub(r"\1", i).strip())
+
+    # 2. Scan source code for imports/libraries
+    code_deps = extract_from_source(content, file_ext)
+    for d in code_deps:
+        software_requirements.add(f"{d} ({file_ext[1:]} library)")
+
+def scan_blob(file_path, blob_sha, load, software_requirements):
+    """scan_file through the content-addressed cache; returns True on a cache hit.
+
+    A blob seen before, in any repo or any earlier run, is neither loaded
+    nor scanned again. load() returns the text, None for binary/generated
+    content (cached as having no dependencies), or raises LoadError, in
+    which case nothing is cached and the blob is tried again next time.
+    """
+    key = scan_key(file_path, blob_sha)
+    found = get_scan(key)
+    hit = found is not None
+    if not hit:
+        found = set()
+        try:
+            content = load()
+        except LoadError as e:
+            print(f"Could not read {file_path}: {e}")
+            return False
+        if content is not None:
+            scan_file(file_path, content, found)
+        put_scan(key, found)
+    software_requirements.update(found)
+    return hit
+
+def analyze_full_repo(github_url, mode="archive", max_file_bytes=MAX_FILE_BYTES, max_repo_bytes=MAX_REPO_BYTES):
+    """Deep-scans a repo. mode='archive' streams one tarball, mode='api' walks the contents API.
+
+    A local checkout or bare git repository path is scanned from disk instead.
+    Files above max_file_bytes, binary/generated files and vendored
+    directories are skipped, and reading stops after max_repo_bytes.
+    """
+    budget = ScanBudget(max_file_bytes, max_repo_bytes)
+    if is_local_source(github_url):
+        local = LocalRepo(github_url)
+        print(f"--- Deep Scanning Local Repository: {local.path} ---")
+        files = local.iter_files(SCANNED_EXTENSIONS, budget)
+    else:
+        match = re.search(r"github\.com/([^/]+)/([^/]+)", github_url)
+        if not match: return
+        owner, repo = match.groups()
+        repo = repo.replace(".git", "")
+
+        print(f"--- Deep Scanning Repository: {owner}/{repo} ({mode}) ---")
+        if mode == "archive":
+            files = iter_archive_files(owner, repo, budget=budget)
+        else:
+            files = iter_api_files(owner, repo, budget=budget)
     
     software_requirements = set()
     
-    for file in all_files:
-        file_name = file['name']
-        file_ext = os.path.splitext(file_name)[1].lower()
-        
-        # Only scan relevant source/config files
-        if file_ext in ['.py', '.r', '.sh', '.json', '.md']:
-            response = requests.get(file['download_url'])
-            if response.status_code == 200:
-                content = response.text
-                
-                # 1. Scan README for manual prerequisites
-                if 'README' in file_name.upper():
-                    # Look for bullet points in Setup/Usage/Prerequisites
-                    prereq_section = re.search(r"(?i)#+\s*(?:Prerequisites|Setup|Usage)(.*?)(?=\n#+|$)", content, re.DOTALL)
-                    if prereq_section:
-                        items = re.findall(r"^[ \t]*[\*\-]\s+(.*)", prereq_section.group(1), re.MULTILINE)
-                        for i in items:
-                            software_requirements.add(re.sub(r"\[(.*?)\]\(.*?\)", r"\1", i).strip())
-
-                # 2. Scan source code for imports/libraries
-                code_deps = extract_from_source(content, file_ext)
-                for d in code_deps:
-                    software_requirements.add(f"{d} ({file_ext[1:]} library)")
+    hits = 0
+    for file_path, blob_sha, load in files:
+        hits += scan_blob(file_path, blob_sha, load, software_requirements)
+    print(f"{budget.summary()}; {hits} files answered from the scan cache")
 
     # Output Results
     print(f"\n[FINAL CONSOLIDATED REQUIREMENTS]")
@@ -75,7 +169,8 @@ def analyze_full_repo(github_url):
     else:
         print("No specific software identified in code or README.")
 
+    return software_requirements
+
 if __name__ == "__main__":
-    import os
     url = "https://github.com/rug-compling/Alpino.git"
     analyze_full_repo(url)
\ No newline at end of file
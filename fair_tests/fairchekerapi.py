@@ -1,6 +1,10 @@
-import requests
 import csv
 import time
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import http_client
 
 # --- CONFIGURATION ---
 DATAVERSE_BASE_URL = "https://datasets.iisg.amsterdam"
@@ -17,7 +21,7 @@ def get_globalise_datasets():
     params = {"q": "*", "type": "dataset", "subtree": DATAVERSE_ALIAS, "per_page": 23}
     
     try:
-        response = requests.get(search_url, params=params)
+        response = http_client.get(search_url, params=params)
         response.raise_for_status()
         items = response.json()['data']['items']
         return [{"title": i.get("name"), "pid": i.get("global_id")} for i in items]
@@ -42,7 +46,7 @@ def run_fair_assessment(pid):
     
     try:
         # According to Swagger, this endpoint expects a 'url' query parameter
-        response = requests.get(FAIR_CHECKER_API, params={"url": resolved_url}, timeout=120)
+        response = http_client.get(FAIR_CHECKER_API, params={"url": resolved_url}, timeout=120)
         
         if response.status_code == 200:
             metrics_results = response.json()
@@ -1,7 +1,11 @@
-import requests
+import os
+import sys
 import json
 import base64
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from http_cache import cached_get
+
 class VREOrchestrator:
     def __init__(self, repo_url):
         self.repo_url = repo_url.strip("/")
@@ -14,7 +18,7 @@ class VREOrchestrator:
     def step_1_analyze_repository(self):
         """Fetches repo content and checks for existing metadata/CI files."""
         print(f"--- Step 1: Analyzing {self.owner_repo} ---")
-        response = requests.get(self.api_url)
+        response = cached_get(self.api_url)
         
         if response.status_code != 200:
             return "Error: Repository not found or inaccessible."
@@ -78,14 +82,14 @@ class VREOrchestrator:
     # --- Helper Utilities ---
 
     def _fetch_file_content(self, path):
-        resp = requests.get(f"{self.api_url}/{path}")
+        resp = cached_get(f"{self.api_url}/{path}")
         if resp.status_code == 200:
             content = base64.b64decode(resp.json()['content']).decode('utf-8')
             return json.loads(content) if path.endswith('.json') else content
         return None
 
     def _find_yaml_in_workflows(self, path):
-        resp = requests.get(f"{self.api_url}/{path}")
+        resp = cached_get(f"{self.api_url}/{path}")
         if resp.status_code == 200:
             files = resp.json()
             for f in files:
@@ -0,0 +1,125 @@
+import hashlib
+import json
+import os
+import subprocess
+import tempfile
+import threading
+import time
+
+import yaml
+
+from backends import setup_script
+from codemeta_fields import names
+from http_cache import CACHE_DIR
+from package_cache import cache_config_paths, with_package_cache
+from timing import span
+
+# {dependency hash: golden instance} of every base image built on this host
+GOLDEN_MANIFEST = os.path.join(CACHE_DIR, "golden_images.json")
+# Smallest disk multipass allows; clones can grow it but never shrink it
+GOLDEN_DISK = "5G"
+
+_manifest_lock = threading.Lock()
+_build_locks = {}
+
+def dependency_hash(deps, os_version):
+    """Same packages (in any order, case or spelling of the list) on the same OS, same hash."""
+    packages = sorted({n.strip().lower() for n in names(deps) if n.strip()})
+    key = json.dumps({"os": str(os_version), "packages": packages})
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+
+def golden_name(digest):
+    return f"golden-{digest}"
+
+def _multipass(*args, quiet=False, check=True):
+    return subprocess.run(["multipass", *args], check=check, capture_output=quiet, text=True)
+
+def load_manifest():
+    if not os.path.exists(GOLDEN_MANIFEST):
+        return {}
+    with open(GOLDEN_MANIFEST, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_manifest(manifest):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(GOLDEN_MANIFEST, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=4)
+
+def _record(digest, entry):
+    with _manifest_lock:
+        manifest = load_manifest()
+        manifest[digest] = entry
+        save_manifest(manifest)
+
+def ensure_golden(deps, os_version, quiet=False):
+    """Name of the stopped base instance with deps installed, built on first use.
+
+    Concurrent callers asking for the same dependency set wait for one build.
+    The build installs through the package cache if one runs, but its
+    settings are removed before the image is stopped: clones get the cache
+    that runs when they are launched (see launch_from_golden).
+    """
+    digest = dependency_hash(deps, os_version)
+    instance = golden_name(digest)
+    with _manifest_lock:
+        lock = _build_locks.setdefault(digest, threading.Lock())
+
+    with lock:
+        exists = _multipass("info", instance, quiet=True, check=False).returncode == 0
+        if digest in load_manifest() and exists:
+            return instance
+        if exists:
+            # Left over from an interrupted build
+            _multipass("delete", "--purge", instance, quiet=quiet, check=False)
+
+        print(f"🏗️ Building golden image '{instance}' for {len(names(deps))} packages on {os_version}...")
+        start = time.time()
+        with tempfile.NamedTemporaryFile("w", prefix=f"init-{instance}-", suffix=".yaml", delete=False) as f:
+            yaml.dump(with_package_cache({"package_update": True, "packages": sorted(set(names(deps)))}), f)
+        try:
+            with span("golden_build", vm=instance, packages=len(names(deps))):
+                _multipass("launch", "--name", instance, "--disk", GOLDEN_DISK, "--cloud-init", f.name,
+                           str(os_version), quiet=quiet)
+                status = _multipass("exec", instance, "--", "cloud-init", "status", "--wait", quiet=True, check=False)
+                # 2 is "done, with recoverable errors" (e.g. deprecated keys); 1 means a module such as the package install failed
+                if status.returncode not in (0, 2):
+                    _multipass("delete", "--purge", instance, quiet=quiet, check=False)
+                    raise RuntimeError(f"Golden image '{instance}' failed to provision: {(status.stdout or '').strip()}")
+                _multipass("exec", instance, "--", "sudo", "rm", "-f", *cache_config_paths(), quiet=quiet)
+                _multipass("stop", instance, quiet=quiet)
+        finally:
+            os.remove(f.name)
+        _record(digest, {"instance": instance, "os": str(os_version),
+                         "packages": sorted({n.strip().lower() for n in names(deps)}),
+                         "built_in": round(time.time() - start, 1), "created": time.time()})
+        return instance
+
+def launch_from_golden(vm_name, specs, deps, runcmd=None, quiet=False):
+    """Launches vm_name as a clone of the golden image for deps, then applies the crate's specs.
+
+    runcmd (the cloud-init commands of the crate, e.g. cloning its repo) is
+    run inside the clone as one root script, like cloud-init does, since
+    clones do not take a new cloud-init. The package cache settings are
+    applied first, for the cache running now.
+    """
+    instance = ensure_golden(deps, specs["os"], quiet=quiet)
+    _multipass("stop", instance, quiet=True, check=False)
+    _multipass("clone", instance, "--name", vm_name, quiet=quiet)
+    _multipass("set", f"local.{vm_name}.cpus={specs['cpus']}", quiet=quiet)
+    _multipass("set", f"local.{vm_name}.memory={specs['memory']}", quiet=quiet)
+    _multipass("set", f"local.{vm_name}.disk={specs['disk']}", quiet=quiet)
+    _multipass("start", vm_name, quiet=quiet)
+    cache = with_package_cache({})
+    if cache:
+        _multipass("exec", vm_name, "--", "sudo", "bash", "-c", setup_script(cache), quiet=quiet)
+    if runcmd:
+        _multipass("exec", vm_name, "--", "sudo", "bash", "-c", "\n".join(runcmd), quiet=quiet)
+
+def remove_golden(digest=None):
+    """Deletes one golden image (or all of them) and forgets it."""
+    manifest = load_manifest()
+    for key in [digest] if digest else list(manifest):
+        if key in manifest:
+            _multipass("delete", "--purge", manifest[key]["instance"], check=False)
+            del manifest[key]
+    save_manifest(manifest)
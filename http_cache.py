@@ -0,0 +1,141 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+import http_client
+
+# Shared by every fetch script; override with CODEMETA_CACHE_DIR
+CACHE_DIR = os.environ.get("CODEMETA_CACHE_DIR", ".cache")
+CACHE_DB = os.path.join(CACHE_DIR, "http_cache.sqlite")
+DEFAULT_TTL = 3600                   # seconds before an entry is revalidated
+MAX_CACHE_BYTES = 512 * 1024 * 1024  # LRU eviction kicks in above this size
+CACHEABLE_STATUS = (200, 404)        # 404s are cached too, so missing files are not re-probed
+
+_local = threading.local()
+_evict_lock = threading.Lock()
+
+class CachedResponse:
+    """The subset of requests.Response used by the scripts, backed by the cache."""
+
+    def __init__(self, url, status_code, headers, content, from_cache=False):
+        self.url = url
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = content
+        self.from_cache = from_cache
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error for url: {self.url}")
+
+def _connect():
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        conn = sqlite3.connect(CACHE_DB, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                status INTEGER,
+                headers TEXT,
+                body BLOB,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL,
+                accessed_at REAL,
+                size INTEGER
+            )""")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_accessed ON responses (accessed_at)")
+        _local.conn = conn
+    return conn
+
+def _lookup(conn, url):
+    return conn.execute(
+        "SELECT status, headers, body, etag, last_modified, fetched_at FROM responses WHERE url = ?",
+        (url,)).fetchone()
+
+def _store(conn, url, res, now):
+    keep = {k: v for k, v in res.headers.items()
+            if k.lower() in ("content-type", "etag", "last-modified")}
+    conn.execute(
+        "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (url, res.status_code, json.dumps(keep), res.content,
+         res.headers.get("ETag"), res.headers.get("Last-Modified"),
+         now, now, len(res.content)))
+    conn.commit()
+    _evict(conn)
+
+def _evict(conn, max_bytes=None):
+    """Drops least recently used entries until the cache fits in max_bytes."""
+    max_bytes = MAX_CACHE_BYTES if max_bytes is None else max_bytes
+    with _evict_lock:
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= max_bytes:
+            return
+        rows = conn.execute("SELECT url, size FROM responses ORDER BY accessed_at").fetchall()
+        stale = []
+        for url, size in rows:
+            if total <= max_bytes:
+                break
+            stale.append((url,))
+            total -= size
+        conn.executemany("DELETE FROM responses WHERE url = ?", stale)
+        conn.commit()
+
+def cached_get(url, headers=None, ttl=DEFAULT_TTL, timeout=10, limiter=None):
+    """GETs a URL through the shared on-disk cache.
+
+    Fresh entries are served without touching the network. Stale entries
+    are revalidated with If-None-Match / If-Modified-Since; a 304 answer is
+    free against the GitHub rate limit and refreshes the entry. Network
+    errors propagate as the usual requests exceptions.
+    """
+    conn = _connect()
+    now = time.time()
+    row = _lookup(conn, url)
+
+    if row and now - row[5] < ttl:
+        conn.execute("UPDATE responses SET accessed_at = ? WHERE url = ?", (now, url))
+        conn.commit()
+        return CachedResponse(url, row[0], json.loads(row[1]), row[2], from_cache=True)
+
+    req_headers = dict(headers or {})
+    if row:
+        if row[3]:
+            req_headers["If-None-Match"] = row[3]
+        if row[4]:
+            req_headers["If-Modified-Since"] = row[4]
+
+    if limiter:
+        limiter.acquire()
+    res = http_client.get(url, headers=req_headers, timeout=timeout)
+    if limiter:
+        limiter.update_from_headers(res.headers)
+
+    if res.status_code == 304 and row:
+        conn.execute("UPDATE responses SET fetched_at = ?, accessed_at = ? WHERE url = ?", (now, now, url))
+        conn.commit()
+        return CachedResponse(url, row[0], json.loads(row[1]), row[2], from_cache=True)
+
+    if res.status_code in CACHEABLE_STATUS:
+        _store(conn, url, res, now)
+    return CachedResponse(url, res.status_code, res.headers, res.content)
+
+def clear_cache():
+    """Removes every cached response."""
+    conn = _connect()
+    conn.execute("DELETE FROM responses")
+    conn.commit()
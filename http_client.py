@@ -0,0 +1,63 @@
+import os
+import threading
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_TIMEOUT = 10                                      # seconds, used when a caller passes none
+POOL_SIZE = int(os.environ.get("HTTP_POOL_SIZE", "16"))   # keep-alive connections per host
+RETRY_STATUS = [429, 500, 502, 503, 504]
+# The token is only ever sent to these hosts, and only over https
+TOKEN_HOSTS = {"api.github.com", "raw.githubusercontent.com"}
+USER_AGENT = "codemeta-ro-crate-vm"
+
+_session = None
+_lock = threading.Lock()
+
+def github_token():
+    return os.environ.get("GITHUB_TOKEN") or os.environ.get("GH_TOKEN")
+
+def get_session():
+    """Returns the process-wide pooled session, creating it on first use.
+
+    Connections are kept alive and reused; at most POOL_SIZE are open per
+    host, extra threads wait for a free one. 429/5xx answers are retried
+    with exponential backoff, honouring Retry-After.
+    """
+    global _session
+    with _lock:
+        if _session is None:
+            retry = Retry(
+                total=5,
+                backoff_factor=0.5,
+                status_forcelist=RETRY_STATUS,
+                allowed_methods=["GET", "HEAD"],  # never POST: it may not be idempotent
+                respect_retry_after_header=True,
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(pool_connections=32, pool_maxsize=POOL_SIZE,
+                                  pool_block=True, max_retries=retry)
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers["User-Agent"] = USER_AGENT
+            _session = session
+    return _session
+
+def request(method, url, headers=None, timeout=DEFAULT_TIMEOUT, **kwargs):
+    """Sends a request through the shared session, adding the GitHub token where it belongs."""
+    headers = dict(headers or {})
+    token = github_token()
+    parsed = urlparse(url)
+    # Never over plain HTTP, where anyone on the path could read it
+    if token and parsed.scheme == "https" and parsed.hostname in TOKEN_HOSTS:
+        headers.setdefault("Authorization", f"Bearer {token}")
+    return get_session().request(method, url, headers=headers, timeout=timeout, **kwargs)
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
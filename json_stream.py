@@ -0,0 +1,123 @@
+import json
+import re
+
+import http_client
+
+CHUNK_SIZE = 64 * 1024
+
+# One JSON token: punctuation, a complete string, or a number/true/false/null
+_TOKEN = re.compile(r'[ \t\n\r]*(?:([{}\[\],:])|("(?:[^"\\]|\\.)*")|(-?[0-9][0-9.eE+-]*|true|false|null))')
+
+def iter_chunks(source, chunk_size=CHUNK_SIZE):
+    """Yields text chunks of a local JSON file or a URL without loading it whole."""
+    if source.startswith(("http://", "https://")):
+        with http_client.get(source, stream=True, timeout=60) as response:
+            response.raise_for_status()
+            response.encoding = response.encoding or "utf-8"
+            yield from response.iter_content(chunk_size=chunk_size, decode_unicode=True)
+    else:
+        with open(source, "r", encoding="utf-8") as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+def iter_tokens(chunks):
+    """Yields ('punct' | 'string' | 'scalar', raw text) for every token in the chunks."""
+    chunks = iter(chunks)
+    buf, pos, eof = "", 0, False
+    while True:
+        match = _TOKEN.match(buf, pos)
+        # A token touching the end of the buffer may continue in the next chunk
+        if (match is None or match.end() == len(buf)) and not eof:
+            chunk = next(chunks, None)
+            if chunk is None:
+                eof = True
+            else:
+                buf, pos = buf[pos:] + chunk, 0
+            continue
+        if match is None:
+            if buf[pos:].strip():
+                raise ValueError(f"Invalid JSON near {buf[pos:pos + 40]!r}")
+            return
+        pos = match.end()
+        if match.group(1):
+            yield "punct", match.group(1)
+        elif match.group(2):
+            yield "string", match.group(2)
+        else:
+            yield "scalar", match.group(3)
+
+def iter_events(chunks):
+    """Event-based JSON parsing with bounded memory.
+
+    Yields (event, value) with event one of start_map, end_map, start_array,
+    end_array, map_key, string, scalar. Only the container stack and the
+    current token are held in memory.
+    """
+    stack = []
+    expect_key = False
+    for kind, text in iter_tokens(chunks):
+        if kind == "punct":
+            if text == "{":
+                stack.append("map")
+                expect_key = True
+                yield "start_map", None
+            elif text == "[":
+                stack.append("array")
+                expect_key = False
+                yield "start_array", None
+            elif text in "}]":
+                yield ("end_map" if stack.pop() == "map" else "end_array"), None
+                expect_key = False
+            elif text == ",":
+                expect_key = stack[-1] == "map"
+            else:  # ':'
+                expect_key = False
+        elif kind == "string":
+            yield ("map_key" if expect_key else "string"), json.loads(text)
+        else:
+            yield "scalar", json.loads(text)
+
+def _build(events, event, value):
+    """Materializes the value starting with (event, value) from the remaining events."""
+    if event == "start_map":
+        obj = {}
+        for event, value in events:
+            if event == "end_map":
+                return obj
+            obj[value] = _build(events, *next(events))
+    if event == "start_array":
+        arr = []
+        for event, value in events:
+            if event == "end_array":
+                return arr
+            arr.append(_build(events, event, value))
+    return value
+
+def iter_records(chunks):
+    """Yields (key, value) for each entry of a top-level JSON object, one at a time.
+
+    Only the current record is ever held in memory, e.g. one codemeta
+    document of the {repo: codemeta} harvest dump.
+    """
+    events = iter_events(chunks)
+    event, _ = next(events, (None, None))
+    if event != "start_map":
+        raise ValueError("Expected a JSON object at the top level")
+    for event, value in events:
+        if event == "end_map":
+            return
+        yield value, _build(events, *next(events))
+
+def iter_items(chunks):
+    """Yields the elements of a top-level JSON array one at a time."""
+    events = iter_events(chunks)
+    event, _ = next(events, (None, None))
+    if event != "start_array":
+        raise ValueError("Expected a JSON array at the top level")
+    for event, value in events:
+        if event == "end_array":
+            return
+        yield _build(events, event, value)
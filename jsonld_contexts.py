@@ -0,0 +1,138 @@
+import copy
+import hashlib
+import json
+import os
+
+import http_client
+from http_cache import CACHE_DIR
+
+# Versioned copies of the @context documents our records use, shipped with the repo
+CONTEXTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "contexts")
+# Contexts that are not bundled are downloaded once and kept here
+CONTEXT_CACHE_DIR = os.path.join(CACHE_DIR, "contexts")
+
+# Prefixes seen in harvested records, on top of those defined by the contexts
+PREFIXES = {
+    "schema": "http://schema.org/",
+    "codemeta": "https://codemeta.github.io/terms/",
+    "owl": "http://www.w3.org/2002/07/owl#",
+    "rdf": "http://www.w3.org/1999/02/22-rdf-syntax-ns#",
+    "rdfs": "http://www.w3.org/2000/01/rdf-schema#",
+    "dct": "http://purl.org/dc/terms/",
+    "xsd": "http://www.w3.org/2001/XMLSchema#",
+}
+# Canonical term set: CodeMeta 3.0, then terms only CodeMeta 2.0 has
+CANONICAL_CONTEXTS = ["https://w3id.org/codemeta/3.0", "https://doi.org/10.5063/schema/codemeta-2.0"]
+
+_index = None
+_contexts = {}
+_iri_to_term = None
+_normalized = {}
+MAX_MEMO = 10000
+
+def _bundled_index():
+    global _index
+    if _index is None:
+        with open(os.path.join(CONTEXTS_DIR, "index.json"), "r", encoding="utf-8") as f:
+            _index = json.load(f)
+    return _index
+
+def contexts_version():
+    return _bundled_index()["version"]
+
+def load_context(url):
+    """The @context document for url: bundled copy, on-disk cache, or (once) the network."""
+    if url in _contexts:
+        return _contexts[url]
+    bundled_files = _bundled_index()["contexts"]
+    bundled = bundled_files.get(url) or bundled_files.get(url.rstrip("/"))
+    if bundled:
+        path = os.path.join(CONTEXTS_DIR, bundled)
+    else:
+        path = os.path.join(CONTEXT_CACHE_DIR, hashlib.sha256(url.encode("utf-8")).hexdigest() + ".jsonld")
+        if not os.path.exists(path):
+            response = http_client.get(url, headers={"Accept": "application/ld+json, application/json"}, timeout=20)
+            response.raise_for_status()
+            os.makedirs(CONTEXT_CACHE_DIR, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(response.text)
+    with open(path, "r", encoding="utf-8") as f:
+        _contexts[url] = json.load(f)
+    return _contexts[url]
+
+def document_loader(url, options=None):
+    """pyld-compatible document loader that never downloads a context twice."""
+    return {"contextUrl": None, "documentUrl": url, "document": load_context(url)}
+
+def expand(document):
+    """Full JSON-LD expansion with the offline loader (needs the optional pyld package)."""
+    from pyld import jsonld
+    return jsonld.expand(document, {"documentLoader": document_loader})
+
+def compact(document, context="https://w3id.org/codemeta/3.0"):
+    """Full JSON-LD compaction with the offline loader (needs the optional pyld package)."""
+    from pyld import jsonld
+    return jsonld.compact(document, context, {"documentLoader": document_loader})
+
+def _expand_iri(key):
+    prefix, sep, rest = key.partition(":")
+    if sep and prefix in PREFIXES and not rest.startswith("//"):
+        return PREFIXES[prefix] + rest
+    return key
+
+def _term_map():
+    """{IRI: canonical term} for every term of the canonical contexts."""
+    global _iri_to_term
+    if _iri_to_term is None:
+        mapping = {}
+        for url in reversed(CANONICAL_CONTEXTS):
+            for term, definition in load_context(url)["@context"].items():
+                iri = definition.get("@id") if isinstance(definition, dict) else definition
+                if isinstance(iri, str) and not iri.startswith("@") and term not in PREFIXES:
+                    mapping[_expand_iri(iri)] = term
+        _iri_to_term = mapping
+    return _iri_to_term
+
+def canonical_key(key):
+    """'schema:name', 'http://schema.org/name' and 'https://schema.org/name' all become 'name'."""
+    if key in ("type", "id"):
+        return "@" + key
+    if key.startswith("@") or (":" not in key):
+        return key
+    iri = _expand_iri(key).replace("https://schema.org/", "http://schema.org/")
+    term = _term_map().get(iri)
+    if term:
+        return term
+    if iri.startswith("http://schema.org/"):
+        return iri[len("http://schema.org/"):]
+    return key
+
+def _normalize(value):
+    if isinstance(value, list):
+        return [_normalize(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+    result = {}
+    for key, item in value.items():
+        canonical = canonical_key(key)
+        # A value under the canonical key wins over a prefixed duplicate
+        if canonical in result and canonical != key:
+            continue
+        result[canonical] = item if key == "@context" else _normalize(item)
+    return result
+
+def normalize_record(record):
+    """A codemeta/RO-Crate record with canonical CodeMeta keys, without any network access.
+
+    Prefixed and full-IRI keys (schema:codeRepository, codemeta:continuousIntegration)
+    become plain terms, and type/id become @type/@id. The normalization is
+    memoized per record content; every caller gets its own copy to modify.
+    """
+    if not isinstance(record, dict):
+        return record
+    digest = hashlib.sha256(json.dumps(record, sort_keys=True).encode("utf-8")).hexdigest()
+    if digest not in _normalized:
+        if len(_normalized) >= MAX_MEMO:
+            _normalized.clear()
+        _normalized[digest] = _normalize(record)
+    return copy.deepcopy(_normalized[digest])
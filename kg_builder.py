@@ -0,0 +1,130 @@
+import argparse
+import re
+from urllib.parse import quote
+
+from rdflib import BNode, Dataset, Graph, Literal, Namespace, RDF, URIRef
+from rdflib.namespace import XSD
+
+from codemeta_fields import authors, names
+from json_stream import iter_chunks, iter_records
+from jsonld_contexts import normalize_record
+
+SCHEMA = Namespace("http://schema.org/")
+DONATION = Namespace("http://example.org/user/")
+
+BATCH_SIZE = 10000
+# Characters N-Triples does not allow in an IRI are excluded (RFC 3987 / RDF 1.1 IRIREF)
+IRI = re.compile(r'^https?://[^\x00-\x20<>"{}|\\^`]+$')
+OUTPUT_FILE = "clariah_codemeta_kg.nt"
+
+def _iri(value):
+    """value as a URIRef if it is a valid http(s) IRI (N-Triples rejects spaces, quotes, braces...), else None."""
+    value = value.strip() if isinstance(value, str) else ""
+    return URIRef(value) if IRI.match(value) else None
+
+def _term(value):
+    """Valid URLs become nodes, anything else a plain literal."""
+    return _iri(value) or Literal(value)
+
+def codemeta_triples(repo, codemeta):
+    """Yields the triples describing one harvested codemeta record."""
+    subject = (_iri(next(iter(names(codemeta.get("codeRepository"))), None))
+               or URIRef(f"https://github.com/{quote(repo, safe='/')}"))
+    yield subject, RDF.type, SCHEMA.SoftwareSourceCode
+    for key in ("name", "description", "version", "dateModified"):
+        for value in names(codemeta.get(key)):
+            yield subject, SCHEMA[key], Literal(value)
+    for key in ("keywords", "programmingLanguage", "applicationCategory"):
+        for value in names(codemeta.get(key)):
+            yield subject, SCHEMA[key], Literal(value)
+    for key in ("license", "softwareRequirements"):
+        for value in names(codemeta.get(key)):
+            yield subject, SCHEMA[key], _term(value)
+    for name, orcid in authors(codemeta):
+        person = (_iri(orcid) if orcid else None) or BNode()
+        yield subject, SCHEMA.author, person
+        yield person, RDF.type, SCHEMA.Person
+        if name:
+            yield person, SCHEMA.name, Literal(name)
+
+def donation_triples(entries):
+    """Yields the triples of data-donation events ({timestamp, place, activity} dicts)."""
+    for i, entry in enumerate(entries):
+        event_uri = DONATION[f"event_{i}"]
+        yield event_uri, RDF.type, SCHEMA.Event
+        yield event_uri, SCHEMA.startDate, Literal(entry["timestamp"], datatype=XSD.dateTime)
+        yield event_uri, SCHEMA.location, Literal(entry["place"])
+        yield event_uri, SCHEMA.description, Literal(entry["activity"])
+
+def open_store(path, identifier=None):
+    """Persistent on-disk rdflib graph (BerkeleyDB), or None if the backend is not installed."""
+    try:
+        import berkeleydb  # noqa: F401  (needed by rdflib's BerkeleyDB store)
+    except ImportError:
+        print("The on-disk store needs berkeleydb: pip install berkeleydb")
+        return None
+    store = Graph(store="BerkeleyDB", identifier=identifier)
+    store.open(path, create=True)
+    return store
+
+def _serialize(batch, graph_name):
+    if graph_name is None:
+        g = Graph()
+        g.addN((s, p, o, g) for s, p, o in batch)
+        return g.serialize(format="nt", encoding="utf-8")
+    ds = Dataset()
+    g = ds.graph(URIRef(graph_name))
+    g.addN((s, p, o, g) for s, p, o in batch)
+    return ds.serialize(format="nquads", encoding="utf-8")
+
+def write_triples(triples, output_file, graph_name=None, store=None, batch_size=BATCH_SIZE):
+    """Writes triples to N-Triples (or N-Quads with a graph_name) as they come in.
+
+    Only one batch is held in memory at a time; each batch is also added to
+    store (a Graph, e.g. from open_store) when given. Duplicates are dropped
+    (by hash, across batches). Returns the number of triples written.
+    """
+    count = 0
+    seen = set()
+    batch = []
+
+    def flush():
+        out.write(_serialize(batch, graph_name))
+        if store is not None:
+            store.addN((s, p, o, store) for s, p, o in batch)
+
+    with open(output_file, "wb") as out:
+        for triple in triples:
+            key = hash(triple)
+            if key in seen:
+                continue
+            seen.add(key)
+            batch.append(triple)
+            count += 1
+            if len(batch) >= batch_size:
+                flush()
+                batch = []
+        if batch:
+            flush()
+    return count
+
+def build_codemeta_kg(source, output_file=OUTPUT_FILE, graph_name=None, store_path=None, batch_size=BATCH_SIZE):
+    """Streams a {repo: codemeta} dump (file or URL) into an RDF file, record by record."""
+    store = open_store(store_path, graph_name and URIRef(graph_name)) if store_path else None
+    triples = (t for repo, cm in iter_records(iter_chunks(source)) if isinstance(cm, dict)
+               for t in codemeta_triples(repo, normalize_record(cm)))
+    count = write_triples(triples, output_file, graph_name, store, batch_size)
+    if store is not None:
+        store.close(commit_pending_transaction=True)
+    print(f"Knowledge Graph created: {output_file} ({count} triples)")
+    return count
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build an RDF knowledge graph of harvested CodeMeta records.")
+    parser.add_argument("source", nargs="?", default="clariah_codemeta_final.json", help="Local JSON file or URL")
+    parser.add_argument("--output", default=OUTPUT_FILE)
+    parser.add_argument("--graph", help="Named graph URI; writes N-Quads instead of N-Triples")
+    parser.add_argument("--store", help="Directory of a persistent BerkeleyDB store to load as well")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+    build_codemeta_kg(args.source, args.output, args.graph, args.store, args.batch_size)
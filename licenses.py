@@ -0,0 +1,153 @@
+import argparse
+import json
+import os
+import re
+from functools import lru_cache, reduce
+
+from codemeta_fields import names
+from json_stream import iter_chunks, iter_records
+from jsonld_contexts import normalize_record
+
+# Tool name/repo -> SPDX ID of the harvested corpus, precomputed by build_license_index
+LICENSE_INDEX_FILE = "clariah_license_index.json"
+
+# Every SPDX ID the compatibility matrix knows; the position is the bit in the masks
+LICENSES = [
+    "0BSD", "MIT", "BSD-2-Clause", "BSD-3-Clause", "ISC", "Zlib", "Unlicense", "CC0-1.0",
+    "Apache-2.0", "MPL-2.0", "EUPL-1.2",
+    "LGPL-2.1-only", "LGPL-2.1-or-later", "LGPL-3.0-only", "LGPL-3.0-or-later",
+    "GPL-2.0-only", "GPL-2.0-or-later", "GPL-3.0-only", "GPL-3.0-or-later",
+    "AGPL-3.0-only", "AGPL-3.0-or-later",
+]
+BIT = {spdx: 1 << i for i, spdx in enumerate(LICENSES)}
+
+PERMISSIVE = ["0BSD", "MIT", "BSD-2-Clause", "BSD-3-Clause", "ISC", "Zlib", "Unlicense", "CC0-1.0"]
+GPL2_FAMILY = ["LGPL-2.1-only", "LGPL-2.1-or-later", "GPL-2.0-only", "GPL-2.0-or-later"]
+V3_COPYLEFT = ["GPL-3.0-only", "GPL-3.0-or-later", "AGPL-3.0-only", "AGPL-3.0-or-later"]
+
+# License of a component -> licenses the combined work may be distributed under
+INBOUND = {
+    **{spdx: LICENSES for spdx in PERMISSIVE},
+    "Apache-2.0": [l for l in LICENSES if l not in PERMISSIVE + GPL2_FAMILY] + ["Apache-2.0"],
+    "MPL-2.0": ["MPL-2.0", "LGPL-2.1-or-later", "LGPL-3.0-only", "LGPL-3.0-or-later",
+                "GPL-2.0-or-later"] + V3_COPYLEFT,
+    "EUPL-1.2": ["EUPL-1.2", "MPL-2.0", "LGPL-2.1-only", "LGPL-3.0-only", "GPL-2.0-only",
+                 "GPL-3.0-only", "AGPL-3.0-only"],
+    "LGPL-2.1-only": ["LGPL-2.1-only", "GPL-2.0-only"],
+    "LGPL-2.1-or-later": GPL2_FAMILY + ["LGPL-3.0-only", "LGPL-3.0-or-later"] + V3_COPYLEFT,
+    "LGPL-3.0-only": ["LGPL-3.0-only"] + V3_COPYLEFT,
+    "LGPL-3.0-or-later": ["LGPL-3.0-only", "LGPL-3.0-or-later"] + V3_COPYLEFT,
+    "GPL-2.0-only": ["GPL-2.0-only"],
+    "GPL-2.0-or-later": ["GPL-2.0-only", "GPL-2.0-or-later"] + V3_COPYLEFT,
+    "GPL-3.0-only": ["GPL-3.0-only", "AGPL-3.0-only", "AGPL-3.0-or-later"],
+    "GPL-3.0-or-later": V3_COPYLEFT,
+    "AGPL-3.0-only": ["AGPL-3.0-only"],
+    "AGPL-3.0-or-later": ["AGPL-3.0-only", "AGPL-3.0-or-later"],
+}
+# Precomputed bitsets: checking a stack is one AND per component
+MASKS = {spdx: reduce(lambda mask, l: mask | BIT[l], outbound, 0) for spdx, outbound in INBOUND.items()}
+
+# Deprecated SPDX IDs and common spellings found in codemeta files
+ALIASES = {
+    "gpl-2.0": "GPL-2.0-only", "gpl-2.0+": "GPL-2.0-or-later", "gpl-3.0": "GPL-3.0-only",
+    "gpl-3.0+": "GPL-3.0-or-later", "gplv2": "GPL-2.0-only", "gplv3": "GPL-3.0-only",
+    "lgpl-2.1": "LGPL-2.1-only", "lgpl-2.1+": "LGPL-2.1-or-later", "lgpl-3.0": "LGPL-3.0-only",
+    "lgpl-3.0+": "LGPL-3.0-or-later", "lgplv3": "LGPL-3.0-only", "agpl-3.0": "AGPL-3.0-only",
+    "agpl-3.0+": "AGPL-3.0-or-later", "agplv3": "AGPL-3.0-only",
+    "license-2.0": "Apache-2.0", "apache 2.0": "Apache-2.0", "apache-2": "Apache-2.0",
+    "apache license 2.0": "Apache-2.0", "apache license, version 2.0": "Apache-2.0",
+    "mit license": "MIT", "the mit license": "MIT", "expat": "MIT",
+    "bsd": "BSD-3-Clause", "new bsd license": "BSD-3-Clause", "simplified bsd license": "BSD-2-Clause",
+    "mpl-2": "MPL-2.0", "eupl 1.2": "EUPL-1.2", "public domain": "Unlicense",
+    "gnu general public license v3": "GPL-3.0-only", "gnu general public license v3.0": "GPL-3.0-only",
+    "gnu general public license v2": "GPL-2.0-only",
+    "gnu lesser general public license v3": "LGPL-3.0-only",
+    "gnu affero general public license v3": "AGPL-3.0-only",
+}
+_BY_LOWER = {spdx.lower(): spdx for spdx in LICENSES}
+# e.g. https://spdx.org/licenses/MIT.html, https://opensource.org/licenses/AGPL-3.0,
+# http://www.apache.org/licenses/LICENSE-2.0, https://www.gnu.org/licenses/gpl-3.0.html
+_LICENSE_URL = re.compile(r"^https?://(?:www\.)?[^/]+/licen[cs]es/(?:.*/)?([^/]+?)(?:\.html|\.json|\.txt|\.en\.html)?/?$", re.I)
+
+@lru_cache(maxsize=None)
+def normalize_license(value):
+    """SPDX ID of a license string or URL, or None when it cannot be identified."""
+    if not isinstance(value, str):
+        return None
+    text = value.strip()
+    match = _LICENSE_URL.match(text)
+    if match:
+        text = match.group(1)
+    key = text.lower()
+    return _BY_LOWER.get(key) or ALIASES.get(key) or ALIASES.get(key.replace(" ", "-"))
+
+def spdx_url(spdx):
+    return f"https://spdx.org/licenses/{spdx}"
+
+def stack_compatibility(licenses):
+    """Checks whether components under the given licenses can be combined into one work.
+
+    licenses are SPDX IDs, strings or URLs. Returns (outbound, unknown):
+    the SPDX IDs the combined work could be distributed under (empty means
+    incompatible, None that no license could be identified, so nothing was
+    checked) and the inputs that could not be identified or are not in the
+    matrix, which therefore were not checked.
+    """
+    mask = (1 << len(LICENSES)) - 1
+    unknown = []
+    checked = False
+    for value in licenses:
+        spdx = normalize_license(value)
+        if spdx not in MASKS:
+            unknown.append(value)
+            continue
+        mask &= MASKS[spdx]
+        checked = True
+    if not checked:
+        return None, unknown
+    return [spdx for spdx in LICENSES if mask & BIT[spdx]], unknown
+
+def build_license_index(source, output_file=LICENSE_INDEX_FILE):
+    """Precomputes {tool name or repo (lowercase): SPDX ID} for a {repo: codemeta} dump."""
+    index = {}
+    for repo, cm in iter_records(iter_chunks(source)):
+        if not isinstance(cm, dict):
+            continue
+        cm = normalize_record(cm)
+        spdx = next((s for s in map(normalize_license, names(cm.get("license"))) if s), None)
+        if spdx is None:
+            continue
+        index[repo.lower()] = spdx
+        for name in names(cm.get("name")):
+            index.setdefault(name.lower(), spdx)
+    with open(output_file, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=4, sort_keys=True)
+    print(f"License index created: {output_file} ({len(index)} entries)")
+    return index
+
+def load_license_index(path=LICENSE_INDEX_FILE):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SPDX license normalization and stack compatibility.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("index", help=f"Precompute {LICENSE_INDEX_FILE} from a harvest dump")
+    build.add_argument("source", nargs="?", default="clariah_codemeta_final.json", help="Local JSON file or URL")
+    check = commands.add_parser("check", help="Check if a stack of licenses or indexed tools can be combined")
+    check.add_argument("items", nargs="+", help="SPDX IDs, license URLs, or tool names/repos from the index")
+    args = parser.parse_args()
+
+    if args.command == "index":
+        build_license_index(args.source)
+    else:
+        index = load_license_index()
+        outbound, unknown = stack_compatibility(index.get(item.lower(), item) for item in args.items)
+        if outbound is None:
+            print("Not checked: no known license in the stack")
+        else:
+            print(f"Compatible, combined work can be: {', '.join(outbound)}" if outbound else "Incompatible licenses")
+        if unknown:
+            print(f"Not checked (unknown license): {', '.join(unknown)}")
@@ -0,0 +1,118 @@
+import os
+import subprocess
+
+from blob_cache import git_blob_sha
+from scan_limits import VENDORED_DIRS, LoadError, ScanBudget
+
+def is_local_source(source):
+    """True if the analyzers should read source from disk instead of GitHub."""
+    return os.path.isdir(os.path.expanduser(source))
+
+class LocalRepo:
+    """Read-only view of a local checkout or a bare git repository.
+
+    Working trees are read from the filesystem; bare repositories are read
+    from git objects at ref, so no checkout is needed.
+    """
+
+    def __init__(self, path, ref="HEAD"):
+        self.path = os.path.abspath(os.path.expanduser(path))
+        self.ref = ref
+        self.bare = (not os.path.exists(os.path.join(self.path, ".git"))
+                     and os.path.isfile(os.path.join(self.path, "HEAD"))
+                     and os.path.isdir(os.path.join(self.path, "objects")))
+
+    @property
+    def name(self):
+        return os.path.basename(self.path.rstrip("/")).replace(".git", "")
+
+    def _git(self, *args):
+        result = subprocess.run(["git", "--git-dir", self.path, *args],
+                                capture_output=True, check=False)
+        return result.stdout if result.returncode == 0 else None
+
+    def list_files(self, recursive=True):
+        """Paths of all files relative to the repo root ('.git' excluded)."""
+        if self.bare:
+            args = ["ls-tree", "--name-only", "-z"] + (["-r"] if recursive else []) + [self.ref]
+            out = self._git(*args)
+            return [p for p in out.decode("utf-8").split("\0") if p] if out else []
+
+        if not recursive:
+            return sorted(e.name for e in os.scandir(self.path)
+                          if e.is_file() and e.name != ".git")
+        files = []
+        for root, dirs, names in os.walk(self.path):
+            dirs[:] = [d for d in dirs if d != ".git"]
+            for name in names:
+                files.append(os.path.relpath(os.path.join(root, name), self.path))
+        return sorted(files)
+
+    def read_bytes(self, rel_path):
+        if self.bare:
+            return self._git("show", f"{self.ref}:{rel_path}")
+        try:
+            with open(os.path.join(self.path, rel_path), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def read(self, rel_path):
+        """Text of a file, or None when it does not exist (like a 404)."""
+        data = self.read_bytes(rel_path)
+        return data.decode("utf-8", errors="replace") if data is not None else None
+
+    def file_sizes(self):
+        """Yields (path, size in bytes, blob sha or None) for every file.
+
+        Bare repos report the blob SHA from git; vendored directories are never entered.
+        """
+        if self.bare:
+            out = self._git("ls-tree", "-r", "-l", "-z", self.ref) or b""
+            for entry in out.decode("utf-8").split("\0"):
+                if not entry:
+                    continue
+                meta, path = entry.split("\t", 1)
+                _, _, sha, size = meta.split()
+                if size != "-":  # submodules have no size
+                    yield path, int(size), sha
+            return
+
+        for root, dirs, names in os.walk(self.path):
+            dirs[:] = [d for d in dirs if d not in VENDORED_DIRS]
+            for name in names:
+                full_path = os.path.join(root, name)
+                if os.path.islink(full_path):
+                    continue
+                try:
+                    size = os.path.getsize(full_path)
+                except OSError:
+                    continue
+                yield os.path.relpath(full_path, self.path), size, None
+
+    def _load(self, rel_path, budget):
+        data = self.read_bytes(rel_path)
+        if data is None:
+            raise LoadError(f"could not read {rel_path} from {self.path}")
+        return budget.accept(data)
+
+    def iter_files(self, extensions, budget=None):
+        """Yields (path, blob sha, load) for every file with one of the given extensions.
+
+        Files are only read if the ScanBudget admits their size, so memory
+        stays bounded however large the repository is. Bare repos are only
+        read when load() is called; working-tree files are read to hash them.
+        """
+        budget = budget or ScanBudget()
+        for rel_path, size, sha in sorted(self.file_sizes()):
+            if os.path.splitext(rel_path)[1].lower() not in extensions:
+                continue
+            if not budget.admit(rel_path, size):
+                continue
+            if sha is None:
+                data = self.read_bytes(rel_path)
+                if data is None:
+                    continue
+                yield rel_path, git_blob_sha(data), lambda data=data: budget.accept(data)
+            else:
+                yield rel_path, sha, lambda rel_path=rel_path: self._load(rel_path, budget)
@@ -0,0 +1,164 @@
+import argparse
+import hashlib
+import json
+import sqlite3
+
+from codemeta_fields import authors, names
+from json_stream import iter_chunks, iter_records
+from jsonld_contexts import normalize_record
+
+# Embedded database answering "which tools ..." questions without rescanning the dump
+STORE_DB = "clariah_codemeta.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS software (
+    id INTEGER PRIMARY KEY,
+    repo TEXT UNIQUE NOT NULL,
+    name TEXT,
+    description TEXT,
+    version TEXT,
+    code_repository TEXT,
+    content_hash TEXT,
+    codemeta TEXT
+);
+CREATE TABLE IF NOT EXISTS authors (software_id INTEGER, name TEXT, orcid TEXT);
+CREATE TABLE IF NOT EXISTS requirements (software_id INTEGER, name TEXT COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS languages (software_id INTEGER, name TEXT COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS licenses (software_id INTEGER, license TEXT COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS authors_sid ON authors (software_id);
+CREATE INDEX IF NOT EXISTS authors_orcid ON authors (orcid);
+CREATE INDEX IF NOT EXISTS requirements_sid ON requirements (software_id);
+CREATE INDEX IF NOT EXISTS requirements_name ON requirements (name);
+CREATE INDEX IF NOT EXISTS languages_sid ON languages (software_id);
+CREATE INDEX IF NOT EXISTS languages_name ON languages (name);
+CREATE INDEX IF NOT EXISTS licenses_sid ON licenses (software_id);
+CREATE INDEX IF NOT EXISTS licenses_license ON licenses (license);
+CREATE VIRTUAL TABLE IF NOT EXISTS software_fts USING fts5(
+    name, description, keywords, tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+CHILD_TABLES = ("authors", "requirements", "languages", "licenses")
+
+def connect(db_file=STORE_DB):
+    conn = sqlite3.connect(db_file)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+def _first(value):
+    return next(iter(names(value)), None)
+
+def upsert(conn, repo, codemeta):
+    """Stores one codemeta record; returns False when it is unchanged since the last ingest.
+
+    Does not commit, so callers can batch many records per transaction.
+    """
+    codemeta = normalize_record(codemeta)
+    raw = json.dumps(codemeta, sort_keys=True)
+    content_hash = hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    row = conn.execute("SELECT id, content_hash FROM software WHERE repo = ?", (repo,)).fetchone()
+    if row and row[1] == content_hash:
+        return False
+
+    if row:
+        software_id = row[0]
+        for table in CHILD_TABLES:
+            conn.execute(f"DELETE FROM {table} WHERE software_id = ?", (software_id,))
+        conn.execute("DELETE FROM software_fts WHERE rowid = ?", (software_id,))
+        conn.execute("UPDATE software SET name = ?, description = ?, version = ?, code_repository = ?,"
+                     " content_hash = ?, codemeta = ? WHERE id = ?",
+                     (_first(codemeta.get("name")), _first(codemeta.get("description")),
+                      _first(codemeta.get("version")), _first(codemeta.get("codeRepository")),
+                      content_hash, raw, software_id))
+    else:
+        software_id = conn.execute(
+            "INSERT INTO software (repo, name, description, version, code_repository, content_hash, codemeta)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (repo, _first(codemeta.get("name")), _first(codemeta.get("description")),
+             _first(codemeta.get("version")), _first(codemeta.get("codeRepository")),
+             content_hash, raw)).lastrowid
+
+    conn.executemany("INSERT INTO authors VALUES (?, ?, ?)",
+                     [(software_id, name, orcid) for name, orcid in authors(codemeta)])
+    conn.executemany("INSERT INTO requirements VALUES (?, ?)",
+                     [(software_id, n) for n in set(names(codemeta.get("softwareRequirements")))])
+    conn.executemany("INSERT INTO languages VALUES (?, ?)",
+                     [(software_id, n) for n in set(names(codemeta.get("programmingLanguage")))])
+    conn.executemany("INSERT INTO licenses VALUES (?, ?)",
+                     [(software_id, n) for n in set(names(codemeta.get("license")))])
+    conn.execute("INSERT INTO software_fts (rowid, name, description, keywords) VALUES (?, ?, ?, ?)",
+                 (software_id, " ".join(names(codemeta.get("name"))),
+                  " ".join(names(codemeta.get("description"))),
+                  " ".join(names(codemeta.get("keywords")) + names(codemeta.get("applicationCategory")))))
+    return True
+
+def ingest(source, db_file=STORE_DB, batch_size=500):
+    """Loads a {repo: codemeta} dump (file or URL) into the store, record by record.
+
+    Unchanged records are skipped, so re-running after a harvest only
+    touches what changed.
+    """
+    conn = connect(db_file)
+    seen = changed = 0
+    for repo, codemeta in iter_records(iter_chunks(source)):
+        if not isinstance(codemeta, dict):
+            continue
+        seen += 1
+        changed += upsert(conn, repo, codemeta)
+        if seen % batch_size == 0:
+            conn.commit()
+    conn.commit()
+    conn.close()
+    print(f"Ingested {seen} records into {db_file} ({changed} new or updated).")
+    return changed
+
+def _fts_query(text):
+    # Every word must match (prefix search); quoting keeps user input out of FTS5 syntax
+    return " ".join('"{}"*'.format(word.replace('"', '""')) for word in text.split())
+
+def query(conn, text=None, language=None, requirement=None, license=None, orcid=None, limit=20):
+    """Tools matching all given filters, best full-text matches first.
+
+    Returns a list of (repo, name, description) tuples.
+    """
+    sql = ["SELECT s.repo, s.name, s.description FROM software s"]
+    where, params = [], []
+    if text:
+        sql.append("JOIN software_fts f ON f.rowid = s.id")
+        where.append("software_fts MATCH ?")
+        params.append(_fts_query(text))
+    for table, column, value in (("languages", "name", language), ("requirements", "name", requirement),
+                                 ("licenses", "license", license), ("authors", "orcid", orcid)):
+        if value:
+            where.append(f"s.id IN (SELECT software_id FROM {table} WHERE {column} = ?)")
+            params.append(value)
+    if where:
+        sql.append("WHERE " + " AND ".join(where))
+    sql.append("ORDER BY bm25(software_fts)" if text else "ORDER BY s.repo")
+    sql.append("LIMIT ?")
+    params.append(limit)
+    return conn.execute(" ".join(sql), params).fetchall()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Index harvested CodeMeta records and search them.")
+    parser.add_argument("--db", default=STORE_DB)
+    commands = parser.add_subparsers(dest="command", required=True)
+    load = commands.add_parser("ingest", help="Load or update records from a {repo: codemeta} JSON dump")
+    load.add_argument("source", nargs="?", default="clariah_codemeta_final.json", help="Local JSON file or URL")
+    find = commands.add_parser("search", help="Find tools by text and/or facets")
+    find.add_argument("text", nargs="?", help="Words to look for in name, description and keywords")
+    find.add_argument("--language")
+    find.add_argument("--requirement")
+    find.add_argument("--license")
+    find.add_argument("--orcid")
+    find.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.command == "ingest":
+        ingest(args.source, args.db)
+    else:
+        conn = connect(args.db)
+        for repo, name, description in query(conn, args.text, args.language, args.requirement,
+                                             args.license, args.orcid, args.limit):
+            print(f"{repo}\t{name or ''}\t{(description or '')[:80]}")
@@ -0,0 +1,239 @@
+import argparse
+import json
+import os
+import posixpath
+import re
+import shutil
+import signal
+import subprocess
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+import http_client
+from http_cache import CACHE_DIR
+
+# Shared by every VM: downloaded .debs, wheels/sdists, npm tarballs and Maven artifacts
+PACKAGE_DIR = os.path.join(CACHE_DIR, "packages")
+# Written while the server runs, so generated configs pick it up automatically
+STATE_FILE = os.path.join(CACHE_DIR, "package_cache.json")
+DEFAULT_PORT = 3142  # apt-cacher-ng's port, which apt users expect
+
+# Path prefix served by the cache -> upstream it mirrors
+UPSTREAMS = {
+    "/pypi/simple/": "https://pypi.org/simple/",
+    "/pypi/files/": "https://files.pythonhosted.org/",
+    "/npm/": "https://registry.npmjs.org/",
+    "/maven2/": "https://repo1.maven.org/maven2/",
+}
+# The only hosts apt may reach through the proxy (and their regional mirrors,
+# e.g. nl.archive.ubuntu.com); extend with $PACKAGE_CACHE_APT_HOSTS
+APT_HOSTS = {"archive.ubuntu.com", "security.ubuntu.com", "ports.ubuntu.com",
+             "deb.debian.org", "security.debian.org"}
+APT_HOSTS |= {h.strip() for h in os.environ.get("PACKAGE_CACHE_APT_HOSTS", "").split(",") if h.strip()}
+# Host side of the multipass network (Linux qemu driver, macOS), where the VMs reach us
+BRIDGE_INTERFACES = ["mpqemubr0", "bridge100"]
+# Immutable artifacts are stored; indexes and metadata always come from upstream
+IMMUTABLE = re.compile(r"\.(deb|udeb|whl|tar\.gz|tgz|zip|tar\.bz2|jar|pom|aar)$")
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+def cache_url():
+    """Base URL of the running package cache: $PACKAGE_CACHE_URL, or the local server's state file."""
+    if os.environ.get("PACKAGE_CACHE_URL"):
+        return os.environ["PACKAGE_CACHE_URL"].rstrip("/")
+    if os.path.exists(STATE_FILE):
+        with open(STATE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)["url"]
+    return None
+
+def apt_host_allowed(host):
+    return any(host == h or host.endswith(f".{h}") for h in APT_HOSTS)
+
+def default_bind():
+    """Address of the multipass bridge, so only the VMs (and this host) can reach the cache; else 127.0.0.1."""
+    for interface in BRIDGE_INTERFACES:
+        for cmd in (["ip", "-4", "-o", "addr", "show", interface], ["ipconfig", "getifaddr", interface]):
+            try:
+                out = subprocess.run(cmd, capture_output=True, text=True).stdout
+            except OSError:
+                continue  # Not this platform's tool
+            if "inet " in out:
+                return out.split("inet ", 1)[1].split("/")[0]
+            if out.strip() and " " not in out.strip():
+                return out.strip()
+    return "127.0.0.1"
+
+def _lock(path):
+    with _locks_guard:
+        return _locks.setdefault(path, threading.Lock())
+
+def cache_path(url):
+    """Where url is stored under PACKAGE_DIR, or None if it would escape it (e.g. '..' segments)."""
+    target = re.sub(r"^https?://", "", url.split("?")[0])
+    if ".." in target.split("/"):
+        return None
+    path = os.path.join(PACKAGE_DIR, posixpath.normpath(target).lstrip("/"))
+    if not os.path.realpath(path).startswith(os.path.realpath(PACKAGE_DIR) + os.sep):
+        return None
+    return path
+
+def _upstream_get(url, **kwargs):
+    # The pooled session itself, without http_client.request()'s GitHub token
+    return http_client.get_session().get(url, **kwargs)
+
+class PackageCacheHandler(BaseHTTPRequestHandler):
+    """Pull-through cache: an apt proxy (absolute http:// URLs) and PyPI/npm/Maven mirrors."""
+
+    def log_message(self, format, *args):
+        pass
+
+    def _upstream(self):
+        if self.path.startswith("http://"):
+            # apt talks to us as an HTTP proxy; anything but its mirrors is refused
+            return self.path if apt_host_allowed(urlparse(self.path).hostname or "") else None
+        for prefix, upstream in UPSTREAMS.items():
+            if self.path.startswith(prefix):
+                return upstream + self.path[len(prefix):]
+        return None
+
+    def _send(self, status, body, content_type="application/octet-stream"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _rewrite(self, body, content_type):
+        # Index pages link to upstream hosts; point them back at this cache
+        base = f"http://{self.headers.get('Host')}"
+        if "html" in content_type or "json" in content_type:
+            body = body.replace(b"https://files.pythonhosted.org/", f"{base}/pypi/files/".encode())
+            body = body.replace(b"https://registry.npmjs.org/", f"{base}/npm/".encode())
+        return body
+
+    def _fetch(self, url, path):
+        """Downloads url to path (streamed, atomically); returns the upstream status."""
+        with _upstream_get(url, stream=True, timeout=300) as response:
+            if response.status_code != 200:
+                return response.status_code
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(f"{path}.part", "wb") as f:
+                for chunk in response.iter_content(chunk_size=1 << 20):
+                    f.write(chunk)
+        os.replace(f"{path}.part", path)
+        return 200
+
+    def do_GET(self):
+        url = self._upstream()
+        if url is None:
+            return self._send(403, b"Not a cached upstream\n", "text/plain")
+        path = cache_path(url)
+        if path is None:
+            return self._send(400, b"Invalid path\n", "text/plain")
+
+        try:
+            if not IMMUTABLE.search(url.split("?")[0]):
+                response = _upstream_get(url, headers={"Accept": self.headers.get("Accept", "*/*")}, timeout=60)
+                content_type = response.headers.get("Content-Type", "application/octet-stream")
+                return self._send(response.status_code, self._rewrite(response.content, content_type), content_type)
+
+            # One download per artifact, however many VMs ask for it at once
+            with _lock(path):
+                status = 200 if os.path.exists(path) else self._fetch(url, path)
+        except Exception as e:
+            return self._send(502, f"Upstream error: {e}\n".encode(), "text/plain")
+        if status != 200:
+            return self._send(status, b"", "text/plain")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(os.path.getsize(path)))
+        self.end_headers()
+        if self.command != "HEAD":
+            with open(path, "rb") as f:
+                shutil.copyfileobj(f, self.wfile)
+
+    do_HEAD = do_GET
+
+def serve(host=None, port=DEFAULT_PORT, advertise=None):
+    """Runs the cache until interrupted; advertise is the address VMs reach the host at.
+
+    Binds to the multipass bridge by default (see default_bind()), not to
+    every interface.
+    """
+    host = host or default_bind()
+    url = f"http://{advertise or host}:{port}"
+    os.makedirs(PACKAGE_DIR, exist_ok=True)
+    with open(STATE_FILE, "w", encoding="utf-8") as f:
+        json.dump({"url": url}, f)
+    server = ThreadingHTTPServer((host, port), PackageCacheHandler)
+    print(f"Package cache serving {PACKAGE_DIR} at {url} (export PACKAGE_CACHE_URL={url})")
+    # Stopped with kill as well as Ctrl-C: clean up the state file either way
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        os.remove(STATE_FILE)
+
+def _maven_settings(url):
+    return ("<settings><mirrors><mirror><id>host-cache</id><mirrorOf>central</mirrorOf>"
+            f"<url>{url}/maven2/</url></mirror></mirrors></settings>\n")
+
+def _config_files(url):
+    """(path, content) of the system-wide pip and npm settings that route through the cache."""
+    host = url.split("://", 1)[1].split(":")[0].split("/")[0]
+    return [
+        ("/etc/pip.conf", f"[global]\nindex-url = {url}/pypi/simple/\ntrusted-host = {host}\n"),
+        ("/etc/npmrc", f"registry={url}/npm/\n"),
+    ]
+
+def cache_config_paths():
+    """Every file with_package_cache() (or cloud-init's apt proxy setting) may leave in a guest."""
+    return ["/etc/apt/apt.conf.d/90cloud-init-aptproxy", "/etc/apt/apt.conf.d/01proxy",
+            *(path for path, _ in _config_files("http://cache")), "/home/ubuntu/.m2/settings.xml"]
+
+def with_package_cache(cloud_init, url=None):
+    """Adds the package cache settings to a cloud-init dict (unchanged when no cache runs)."""
+    url = url or cache_url()
+    if not url:
+        return cloud_init
+    files = [{"path": path, "content": content} for path, content in _config_files(url)]
+    files.append({"path": "/home/ubuntu/.m2/settings.xml", "content": _maven_settings(url),
+                  "owner": "ubuntu:ubuntu", "defer": True})
+    return {
+        **cloud_init,
+        "apt": {**cloud_init.get("apt", {}), "proxy": url},
+        "write_files": cloud_init.get("write_files", []) + files,
+    }
+
+def ansible_cache_tasks(url=None):
+    """Ansible tasks pointing apt, pip, npm and Maven at the package cache ([] when no cache runs)."""
+    url = url or cache_url()
+    if not url:
+        return []
+    tasks = [{
+        "name": "Use the host package cache for apt",
+        "copy": {"dest": "/etc/apt/apt.conf.d/01proxy", "content": f'Acquire::http::Proxy "{url}";\n'},
+        "when": "ansible_os_family == 'Debian'"
+    }]
+    for path, content in _config_files(url):
+        tasks.append({"name": f"Use the host package cache in {path}", "copy": {"dest": path, "content": content}})
+    tasks.append({"name": "Create the Maven settings directory",
+                  "file": {"path": "{{ ansible_env.HOME }}/.m2", "state": "directory"}})
+    tasks.append({"name": "Use the host package cache for Maven",
+                  "copy": {"dest": "{{ ansible_env.HOME }}/.m2/settings.xml", "content": _maven_settings(url)}})
+    return tasks
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a shared apt/PyPI/npm/Maven cache to local VMs.")
+    parser.add_argument("--bind", help="Address to listen on (default: the multipass bridge, else 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--advertise", help="Host address as seen from the VMs (e.g. the multipass bridge IP)")
+    args = parser.parse_args()
+    serve(args.bind, args.port, args.advertise)
@@ -0,0 +1,137 @@
+import ast
+import hashlib
+import io
+import re
+import sys
+import threading
+import tokenize
+from collections import OrderedDict
+
+# Import names that differ from the PyPI distribution that provides them.
+# Anything not listed is assumed to be published under its import name.
+IMPORT_TO_DIST = {
+    "attr": "attrs",
+    "bs4": "beautifulsoup4",
+    "Bio": "biopython",
+    "cairo": "pycairo",
+    "Crypto": "pycryptodome",
+    "cv2": "opencv-python",
+    "dateutil": "python-dateutil",
+    "docx": "python-docx",
+    "dotenv": "python-dotenv",
+    "fitz": "PyMuPDF",
+    "gi": "PyGObject",
+    "git": "GitPython",
+    "google.protobuf": "protobuf",
+    "jose": "python-jose",
+    "jwt": "PyJWT",
+    "ldap": "python-ldap",
+    "magic": "python-magic",
+    "MySQLdb": "mysqlclient",
+    "OpenSSL": "pyOpenSSL",
+    "PIL": "Pillow",
+    "pptx": "python-pptx",
+    "psycopg2": "psycopg2-binary",
+    "pyld": "PyLD",
+    "rdflib_jsonld": "rdflib-jsonld",
+    "serial": "pyserial",
+    "skimage": "scikit-image",
+    "sklearn": "scikit-learn",
+    "slugify": "python-slugify",
+    "socks": "PySocks",
+    "telegram": "python-telegram-bot",
+    "usb": "pyusb",
+    "win32api": "pywin32",
+    "yaml": "PyYAML",
+    "zmq": "pyzmq",
+}
+
+# Python >= 3.10 ships the list; '__future__' is not a real dependency either
+STDLIB_MODULES = set(getattr(sys, "stdlib_module_names", ())) | {"__future__", "__main__"}
+
+# Import lists of this many distinct files are kept, least recently used dropped first
+MAX_MEMO = 10000
+
+_memo = OrderedDict()
+_memo_lock = threading.Lock()
+
+def _imports_from_ast(source):
+    names = []
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.Import):
+            names.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            names.append(node.module)
+    return names
+
+def _imports_from_tokens(source):
+    """Fallback for files that do not parse (e.g. Python 2): strings and comments are skipped."""
+    names = []
+    try:
+        for tok in tokenize.generate_tokens(io.StringIO(source).readline):
+            if tok.type != tokenize.NAME or tok.line[:tok.start[1]].strip():
+                continue
+            statement = tok.line[tok.start[1]:]
+            if tok.string == "import":
+                for part in statement[len("import"):].split(";")[0].split(","):
+                    match = re.match(r"\s*([\w.]+)", part)
+                    if match:
+                        names.append(match.group(1))
+            elif tok.string == "from":
+                match = re.match(r"from\s+(\w[\w.]*)\s+import\b", statement)
+                if match:
+                    names.append(match.group(1))
+    except (tokenize.TokenError, IndentationError, SyntaxError):
+        pass
+    return names
+
+def to_distribution(import_name):
+    """Maps a dotted import name to the PyPI distribution that provides it."""
+    for key in (".".join(import_name.split(".")[:2]), import_name.split(".")[0]):
+        if key in IMPORT_TO_DIST:
+            return IMPORT_TO_DIST[key]
+    return import_name.split(".")[0]
+
+def python_dependencies(source):
+    """Third-party PyPI distributions imported by a Python source file.
+
+    Relative imports, stdlib modules and text inside strings are ignored.
+    Results are memoized by content hash (the MAX_MEMO most recent files),
+    so identical files are parsed once.
+    """
+    key = hashlib.sha256(source.encode("utf-8", errors="replace")).hexdigest()
+    with _memo_lock:
+        if key in _memo:
+            _memo.move_to_end(key)
+            return list(_memo[key])
+
+    try:
+        names = _imports_from_ast(source)
+    except (SyntaxError, ValueError):
+        names = _imports_from_tokens(source)
+
+    deps = []
+    for name in names:
+        if name.split(".")[0] in STDLIB_MODULES:
+            continue
+        dist = to_distribution(name)
+        if dist not in deps:
+            deps.append(dist)
+
+    with _memo_lock:
+        _memo[key] = tuple(deps)
+        if len(_memo) > MAX_MEMO:
+            _memo.popitem(last=False)
+    return deps
+
+def parse_requirements(content):
+    """Distribution names from a requirements.txt (comments, options and markers dropped)."""
+    packages = []
+    for line in content.splitlines():
+        line = line.split("#", 1)[0].strip()
+        if not line or line.startswith("-"):
+            continue
+        match = re.match(r"[A-Za-z0-9][A-Za-z0-9._-]*", line)
+        if match and match.group(0) not in packages:
+            packages.append(match.group(0))
+    return packages
@@ -0,0 +1,71 @@
+import threading
+import time
+
+class TokenBucket:
+    """Thread-safe token bucket that also honours GitHub's rate-limit headers.
+
+    Workers call acquire() before every request and update_from_headers()
+    with the response headers, so a Retry-After or an exhausted
+    X-RateLimit-Remaining pauses every thread until the window resets.
+    """
+
+    def __init__(self, rate=10.0, capacity=10):
+        self.max_rate = float(rate)      # configured ceiling, tokens per second
+        self.rate = self.max_rate
+        self.capacity = float(capacity)  # maximum burst size
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """Blocks until a request may be sent."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                else:
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Stops all workers for the given number of seconds."""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def update_from_headers(self, headers):
+        """Adjusts the bucket from Retry-After / X-RateLimit-* response headers."""
+        retry_after = headers.get("Retry-After")
+        if retry_after:
+            try:
+                self.pause(float(retry_after))
+            except ValueError:
+                pass  # HTTP-date form; the remaining/reset pair below covers it
+            return
+
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset = headers.get("X-RateLimit-Reset")
+        if remaining is None or reset is None:
+            return
+        try:
+            remaining, reset = int(remaining), float(reset)
+        except ValueError:
+            return
+
+        window = max(reset - time.time(), 0)
+        if remaining <= 0:
+            print(f"Rate limit exhausted, pausing {window:.0f}s until reset...")
+            self.pause(window + 1)
+        elif window > 0:
+            # Spread the remaining budget evenly over the rest of the window
+            with self.lock:
+                self.rate = min(self.max_rate, max(remaining / window, 0.01))
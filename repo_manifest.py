@@ -0,0 +1,113 @@
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import http_client
+from branch_resolver import repo_slug
+from http_cache import cached_get
+
+# Last-seen HEAD of every harvested repo, kept between nightly runs
+MANIFEST_FILE = "clariah_repo_manifest.json"
+GRAPHQL_URL = "https://api.github.com/graphql"
+GRAPHQL_BATCH = 50
+GRAPHQL_RETRIES = 3
+
+def load_manifest(path=MANIFEST_FILE):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest(manifest, path=MANIFEST_FILE):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+def _post_query(query):
+    """POSTs a GraphQL query, retrying 429/5xx and network errors.
+
+    The session never retries POSTs; these queries only read, so it is safe here.
+    """
+    for attempt in range(GRAPHQL_RETRIES):
+        try:
+            res = http_client.post(GRAPHQL_URL, json={"query": query}, timeout=30)
+            if res.status_code not in http_client.RETRY_STATUS:
+                return res
+        except Exception:
+            if attempt == GRAPHQL_RETRIES - 1:
+                raise
+        time.sleep(2 ** attempt)
+    return res
+
+def _fetch_heads_graphql(slugs):
+    """One GraphQL request per GRAPHQL_BATCH repos (needs a token)."""
+    heads = {}
+    for start in range(0, len(slugs), GRAPHQL_BATCH):
+        batch = slugs[start:start + GRAPHQL_BATCH]
+        fields = []
+        for i, slug in enumerate(batch):
+            owner, name = slug.split("/", 1)
+            fields.append(
+                f'r{i}: repository(owner: {json.dumps(owner)}, name: {json.dumps(name)}) '
+                '{ pushedAt defaultBranchRef { target { oid } } }')
+        query = "query { " + " ".join(fields) + " }"
+        try:
+            res = _post_query(query)
+            data = res.json().get("data") or {}
+        except Exception as e:
+            print(f"GraphQL batch failed: {e}")
+            continue
+        for i, slug in enumerate(batch):
+            repo = data.get(f"r{i}")
+            if repo and repo.get("defaultBranchRef"):
+                heads[slug] = {"sha": repo["defaultBranchRef"]["target"]["oid"],
+                               "pushed_at": repo["pushedAt"]}
+    return heads
+
+def _fetch_head_rest(slug, limiter=None):
+    """Two conditional REST calls; unchanged repos answer 304, which is free."""
+    res = cached_get(f"https://api.github.com/repos/{slug}", ttl=0, limiter=limiter)
+    if res.status_code != 200:
+        return None
+    info = res.json()
+    res = cached_get(f"https://api.github.com/repos/{slug}/commits/{info['default_branch']}",
+                     headers={"Accept": "application/vnd.github.sha"}, ttl=0, limiter=limiter)
+    if res.status_code != 200:
+        return None
+    return {"sha": res.text.strip(), "pushed_at": info.get("pushed_at")}
+
+def _safe_head_rest(slug, limiter=None):
+    try:
+        return _fetch_head_rest(slug, limiter=limiter)
+    except Exception:
+        return None
+
+def fetch_heads(repos, limiter=None, workers=8):
+    """Returns {owner/repo: {'sha', 'pushed_at'}} for every repo that could be resolved.
+
+    Uses batched GraphQL when a GitHub token is set, conditional REST otherwise.
+    """
+    slugs = [repo_slug(r) for r in repos]
+    if http_client.github_token():
+        return _fetch_heads_graphql(slugs)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(lambda slug: _safe_head_rest(slug, limiter), slugs)
+        return {slug: head for slug, head in zip(slugs, results) if head}
+
+def changed_repos(repos, manifest, heads):
+    """Repos whose HEAD differs from the manifest, or that could not be checked."""
+    changed = []
+    for repo in repos:
+        slug = repo_slug(repo)
+        head = heads.get(slug)
+        if head is None or manifest.get(slug, {}).get("sha") != head["sha"]:
+            changed.append(repo)
+    return changed
+
+def record_head(manifest, repo, head):
+    """Marks a repo as processed at the given HEAD."""
+    manifest[repo_slug(repo)] = dict(head, checked_at=time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()))
@@ -1,37 +1,61 @@
-import requests
+import argparse
+
 import pandas as pd
 
+from codemeta_fields import iter_strings, names, orcids
+from json_stream import iter_chunks, iter_events, iter_records
+from jsonld_contexts import normalize_record
+
+# One row per harvested codemeta entry; list columns hold several values
+REPO_COLUMNS = ["repo", "name", "code_repository", "version", "license",
+                "programming_languages", "software_requirements", "orcids", "github_links"]
+
+def matches(value):
+    """Yields ('github', clean .git URL) and/or ('orcid', value) for a string value."""
+    # Check for GitHub link
+    if "github.com" in value:
+        # Clean the URL and ensure it ends with .git
+        clean_url = value.strip().rstrip('/')
+        if not clean_url.endswith('.git'):
+            clean_url += ".git"
+        yield "github", clean_url
+
+    # Check for ORCID
+    if "orcid.org" in value:
+        yield "orcid", value
+
 def find_values(data, github_list, orcid_list):
-    """Recursively crawls JSON to find specific GitHub .git links and ORCIDs."""
-    if isinstance(data, dict):
-        for key, value in data.items():
-            if isinstance(value, str):
-                # Check for GitHub link
-                if "github.com" in value:
-                    # Clean the URL and ensure it ends with .git
-                    clean_url = value.strip().rstrip('/')
-                    if not clean_url.endswith('.git'):
-                        clean_url += ".git"
-                    github_list.add(clean_url)
-                
-                # Check for ORCID
-                if "orcid.org" in value:
-                    orcid_list.add(value)
-            else:
-                find_values(value, github_list, orcid_list)
-    elif isinstance(data, list):
-        for item in data:
-            find_values(item, github_list, orcid_list)
-
-def generate_git_csv_report(url, output_filename="codemeta_git_report.csv"):
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()
+    """Crawls already-loaded JSON to find specific GitHub .git links and ORCIDs.
+
+    Uses an explicit stack instead of recursion, so deep documents cannot
+    hit the recursion limit.
+    """
+    stack = [data]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            stack.extend(item)
+        elif isinstance(item, str):
+            for kind, value in matches(item):
+                (github_list if kind == "github" else orcid_list).add(value)
+
+def iter_matches(source):
+    """Streams a JSON dump (local path or URL) and yields ('github' | 'orcid', value) as found.
 
+    One event-based pass: memory does not grow with the size of the dump.
+    """
+    for event, value in iter_events(iter_chunks(source)):
+        if event == "string":
+            yield from matches(value)
+
+def generate_git_csv_report(source, output_filename="codemeta_git_report.csv"):
+    try:
         github_repos = set()
         orcids = set()
-        find_values(data, github_repos, orcids)
+        for kind, value in iter_matches(source):
+            (github_repos if kind == "github" else orcids).add(value)
 
         if not github_repos and not orcids:
             print("No matching data found.")
@@ -51,12 +75,72 @@ def generate_git_csv_report(url, output_filename="codemeta_git_report.csv"):
         df.to_csv(output_filename, index=False)
         print(f"File created: {output_filename}")
         print(f"Total .git repositories identified: {len(github_repos)}")
-        
+
         return df
 
     except Exception as e:
         print(f"An error occurred: {e}")
 
+def build_repo_columns(source):
+    """Reads a {repo: codemeta} dump record by record into per-column lists.
+
+    Keeps the repo/ORCID association that the flat report loses; values are
+    appended straight into their column, no per-row dicts are built.
+    """
+    columns = {c: [] for c in REPO_COLUMNS}
+    for repo, cm in iter_records(iter_chunks(source)):
+        if not isinstance(cm, dict):
+            continue
+        cm = normalize_record(cm)
+        columns["repo"].append(repo)
+        columns["name"].append(next(iter(names(cm.get("name"))), None))
+        columns["code_repository"].append(next(iter(names(cm.get("codeRepository"))), None))
+        columns["version"].append(next(iter(names(cm.get("version"))), None))
+        columns["license"].append("; ".join(names(cm.get("license"))) or None)
+        columns["programming_languages"].append(names(cm.get("programmingLanguage")))
+        columns["software_requirements"].append(names(cm.get("softwareRequirements")))
+        columns["orcids"].append(orcids(cm))
+        columns["github_links"].append(sorted({v for s in iter_strings(cm) for k, v in matches(s) if k == "github"}))
+    return columns
+
+def write_repo_table(columns, output_filename):
+    """Writes the per-repo columns as Parquet, Arrow IPC (.arrow/.feather) or CSV."""
+    if output_filename.endswith(".csv"):
+        flat = {c: [";".join(v) if isinstance(v, list) else v for v in values] for c, values in columns.items()}
+        pd.DataFrame(flat).to_csv(output_filename, index=False)
+    else:
+        try:
+            import pyarrow as pa
+            import pyarrow.feather as feather
+            import pyarrow.parquet as pq
+        except ImportError:
+            print("Parquet/Arrow output needs pyarrow: pip install pyarrow (or use a .csv file name).")
+            return None
+        table = pa.table(columns)
+        if output_filename.endswith((".arrow", ".feather")):
+            feather.write_feather(table, output_filename)
+        else:
+            pq.write_table(table, output_filename)
+    print(f"File created: {output_filename} ({len(columns['repo'])} repositories)")
+    return output_filename
+
+def generate_repo_report(source, output_filename="codemeta_repo_report.parquet"):
+    try:
+        return write_repo_table(build_repo_columns(source), output_filename)
+    except Exception as e:
+        print(f"An error occurred: {e}")
+
 # Configuration
 TARGET_URL = "https://github.com/firmao/codemeta-ro-crate-vm/raw/refs/heads/main/clariah_codemeta_final.json"
-generate_git_csv_report(TARGET_URL)
\ No newline at end of file
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report GitHub repositories and ORCIDs found in a CodeMeta dump.")
+    parser.add_argument("source", nargs="?", default=TARGET_URL, help="Local JSON file or URL")
+    parser.add_argument("--output", default="codemeta_git_report.csv")
+    parser.add_argument("--per-repo", metavar="FILE",
+                        help="Write one row per repository instead (.parquet, .arrow/.feather or .csv)")
+    args = parser.parse_args()
+    if args.per_repo:
+        generate_repo_report(args.source, args.per_repo)
+    else:
+        generate_git_csv_report(args.source, args.output)
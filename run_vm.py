@@ -3,16 +3,10 @@ import subprocess
 import sys
 import os
 
-def run_command(command):
-    """Executes a shell command and prints the output."""
-    try:
-        result = subprocess.run(command, check=True, text=True, capture_output=True)
-        print(result.stdout)
-    except subprocess.CalledProcessError as e:
-        print(f"Error executing command: {e.stderr}")
-        sys.exit(1)
+from backends import BACKENDS, get_backend
+from timing import collect_guest_spans, span
 
-def launch_vm(config_path):
+def launch_vm(config_path, backend=None):
     # Load YAML configuration
     if not os.path.exists(config_path):
         print(f"Error: {config_path} not found.")
@@ -23,32 +17,25 @@ def launch_vm(config_path):
 
     vm = config['vm_settings']
     
+    backend = get_backend(backend)
+
     print(f"--- Launching VM: {vm['name']} ---")
-    
-    # Construct the Multipass launch command
-    launch_cmd = [
-        "multipass", "launch",
-        "--name", vm['name'],
-        "--cpus", str(vm['cpus']),
-        "--memory", vm['memory'],
-        "--disk", vm['disk'],
-        vm['image']
-    ]
-
-    # Optional: Add cloud-init if provided for auto-configuration
-    if 'cloud_init' in vm:
-        with open("temp_cloud_init.yaml", "w") as f:
-            f.write(vm['cloud_init'])
-        launch_cmd.extend(["--cloud-init", "temp_cloud_init.yaml"])
-
-    run_command(launch_cmd)
-    
-    # Clean up temp file
-    if os.path.exists("temp_cloud_init.yaml"):
-        os.remove("temp_cloud_init.yaml")
+
+    specs = {"cpus": vm['cpus'], "memory": vm['memory'], "disk": vm['disk'], "os": vm['image']}
+    # Optional: cloud-init for auto-configuration
+    cloud_init = yaml.safe_load(vm['cloud_init']) if 'cloud_init' in vm else {}
+
+    try:
+        with span("vm_launch", vm=vm['name'], backend=backend.name, golden=False):
+            backend.launch(vm['name'], specs, cloud_init)
+    except subprocess.CalledProcessError as e:
+        # stderr is only captured by quiet launches; otherwise it was printed already
+        print(f"Error executing command: {e.stderr or e}")
+        sys.exit(1)
+    collect_guest_spans(vm['name'], backend)
 
     print(f"--- VM {vm['name']} is now running! ---")
-    print("To enter the VM, run: multipass shell " + vm['name'])
+    print("To enter the VM, run: " + backend.shell_command(vm['name']))
 
 if __name__ == "__main__":
-    launch_vm("config.yaml")
+    launch_vm("config.yaml", sys.argv[1] if len(sys.argv) > 1 and sys.argv[1] in BACKENDS else None)
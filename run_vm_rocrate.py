@@ -1,16 +1,39 @@
 import json
 import yaml
-import subprocess
 import os
 
+from backends import launch
+from codemeta_fields import names
+from jsonld_contexts import normalize_record
+from licenses import MASKS, load_license_index, normalize_license, spdx_url, stack_compatibility
+from timing import span, timed
+
+def check_licenses(cm, deps, index=None):
+    """License compatibility of the tool with those of its dependencies found in the license index."""
+    index = load_license_index() if index is None else index
+    stack = names(cm.get("license")) + [index[n.lower()] for n in names(deps) if n.lower() in index]
+    outbound, unknown = stack_compatibility(stack)
+    # Unidentified licenses (e.g. 'Proprietary') may forbid what the known ones allow
+    if outbound is None or (outbound and unknown):
+        compatible = None
+    else:
+        compatible = bool(outbound)
+    return {
+        "compatible": compatible,
+        "checkedLicenses": sorted({normalize_license(l) for l in stack} & set(MASKS)),
+        "outboundLicenses": outbound if compatible else [],
+        "unknownLicenses": unknown
+    }
+
+@timed("crate_generation")
 def generate_ro_crate(codemeta_path, output_yaml):
     """Converts Codemeta to RO-Crate YAML and extracts VM specs."""
     if not os.path.exists(codemeta_path):
         print(f"❌ Error: {codemeta_path} not found.")
         return None
 
-    with open(codemeta_path, 'r') as f:
-        cm = json.load(f)
+    with span("metadata_fetch", input=codemeta_path), open(codemeta_path, 'r') as f:
+        cm = normalize_record(json.load(f))
 
     # Map Codemeta softwareRequirements to a list for Cloud-init
     # Handles both strings and lists from Codemeta
@@ -18,6 +41,12 @@ def generate_ro_crate(codemeta_path, output_yaml):
     if isinstance(deps, str):
         deps = [deps]
 
+    # SPDX license of the tool, and whether its stack can be combined
+    spdx = next((s for s in map(normalize_license, names(cm.get("license"))) if s), None)
+    compatibility = check_licenses(cm, deps)
+    if compatibility["compatible"] is False:
+        print(f"⚠️ Incompatible licenses in stack: {', '.join(compatibility['checkedLicenses'])}")
+
     # Structure the RO-Crate YAML
     ro_crate_data = {
         "@context": "https://w3id.org/ro/crate/1.1/context",
@@ -34,7 +63,8 @@ def generate_ro_crate(codemeta_path, output_yaml):
                 "name": cm.get("name", "software-vm"),
                 "description": cm.get("description", "Auto-generated VM environment"),
                 "author": cm.get("author", "Unknown"),
-                "license": cm.get("license", "Unspecified"),
+                "license": {"@id": spdx_url(spdx)} if spdx else cm.get("license", "Unspecified"),
+                "licenseCompatibility": compatibility,
                 # Store VM hardware requirements here
                 "virtualization": {
                     "cpus": cm.get("runtimePlatform", {}).get("cpus", 2),
@@ -54,8 +84,11 @@ def generate_ro_crate(codemeta_path, output_yaml):
     print(f"✅ Generated RO-Crate file: {output_yaml}")
     return ro_crate_data
 
-def launch_vm_with_deps(crate_data):
-    """Creates a Cloud-init config and launches the Multipass VM."""
+def launch_vm_with_deps(crate_data, quiet=False, golden=False, backend=None):
+    """Creates a Cloud-init config and launches the VM (multipass unless another backend is given).
+
+    quiet, golden and backend are passed to backends.launch().
+    """
     # Extract data from the dataset node (the './' entry)
     main_node = next(n for n in crate_data["@graph"] if n["@id"] == "./")
     specs = main_node["virtualization"]
@@ -67,29 +100,10 @@ def launch_vm_with_deps(crate_data):
         "package_update": True,
         "packages": deps
     }
-    
-    with open("init.yaml", "w") as f:
-        yaml.dump(cloud_init, f)
-
-    print(f"🚀 Provisioning VM '{vm_name}' with dependencies: {', '.join(deps)}...")
-
-    cmd = [
-        "multipass", "launch",
-        "--name", vm_name,
-        "--cpus", str(specs["cpus"]),
-        "--memory", specs["memory"],
-        "--disk", specs["disk"],
-        "--cloud-init", "init.yaml",
-        specs["os"]
-    ]
 
-    try:
-        subprocess.run(cmd, check=True)
-        print(f"✨ Success! VM '{vm_name}' is live.")
-        print(f"👉 Enter with: multipass shell {vm_name}")
-    finally:
-        if os.path.exists("init.yaml"):
-            os.remove("init.yaml")
+    backend = launch(vm_name, specs, deps, cloud_init, quiet=quiet, golden=golden, backend=backend)
+    print(f"✨ Success! VM '{vm_name}' is live.")
+    print(f"👉 Enter with: {backend.shell_command(vm_name)}")
 
 if __name__ == "__main__":
     # Define file paths
@@ -0,0 +1,63 @@
+MAX_FILE_BYTES = 1024 * 1024         # larger files are data dumps, not code
+MAX_REPO_BYTES = 64 * 1024 * 1024    # stop reading a repo after this many bytes
+SNIFF_BYTES = 8192
+# Third-party code shipped inside a repo says nothing about its own requirements
+VENDORED_DIRS = {"node_modules", "vendor", "third_party", ".venv", "venv", "env",
+                 "site-packages", "__pycache__", ".tox", ".git", "bower_components"}
+GENERATED_MARKERS = (b"@generated", b"do not edit", b"code generated by",
+                     b"autogenerated", b"auto-generated")
+
+def is_vendored(path):
+    """True if any directory in the relative path is a vendored/tooling directory."""
+    return any(part in VENDORED_DIRS for part in path.replace("\\", "/").split("/")[:-1])
+
+def sniff(head):
+    """Classifies the first bytes of a file: 'binary', 'generated' or None for normal text."""
+    head = head[:SNIFF_BYTES]
+    if b"\0" in head:
+        return "binary"
+    if any(marker in head[:1024].lower() for marker in GENERATED_MARKERS):
+        return "generated"
+    return None
+
+class LoadError(Exception):
+    """A file's content could not be read (HTTP error, rate limit, I/O); nothing may be cached for it."""
+
+class ScanBudget:
+    """Per-file and per-repo byte limits for one repository scan.
+
+    admit() is checked with the size reported by the source (tar header,
+    contents API, stat) before anything is read, so skipped files cost no
+    memory. accept() sniffs the bytes that were read and decodes them.
+    """
+
+    def __init__(self, max_file_bytes=MAX_FILE_BYTES, max_repo_bytes=MAX_REPO_BYTES):
+        self.max_file_bytes = max_file_bytes
+        self.max_repo_bytes = max_repo_bytes
+        self.used = 0
+        self.skipped = {"vendored": 0, "too large": 0, "repo budget": 0, "binary": 0, "generated": 0}
+
+    def admit(self, path, size):
+        if is_vendored(path):
+            reason = "vendored"
+        elif size > self.max_file_bytes:
+            reason = "too large"
+        elif self.used + size > self.max_repo_bytes:
+            reason = "repo budget"
+        else:
+            self.used += size
+            return True
+        self.skipped[reason] += 1
+        return False
+
+    def accept(self, data):
+        """Returns the decoded text, or None if the content is binary or generated."""
+        reason = sniff(data)
+        if reason:
+            self.skipped[reason] += 1
+            return None
+        return data.decode("utf-8", errors="replace")
+
+    def summary(self):
+        skipped = ", ".join(f"{n} {reason}" for reason, n in self.skipped.items() if n)
+        return f"Read {self.used / 1024:.0f} KiB" + (f"; skipped {skipped}" if skipped else "")
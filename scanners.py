@@ -0,0 +1,89 @@
+import re
+
+from python_imports import python_dependencies
+
+# file extension -> list of (pattern, flags) registered for it
+_PATTERNS = {}
+# file extension -> one compiled alternation of all its patterns
+_COMPILED = {}
+# file extension -> analyzer function(content) -> list of dependency names
+_ANALYZERS = {}
+
+def register_scanner(extensions, pattern, flags=""):
+    """Registers a dependency pattern for some file extensions.
+
+    The pattern must have exactly one capture group (the dependency name).
+    flags is a string of inline regex flags ('m', 'i', 's') scoped to this
+    pattern only, so all patterns of an extension can share one regex and
+    a file is scanned in a single pass.
+    """
+    for ext in extensions:
+        ext = ext.lower()
+        _PATTERNS.setdefault(ext, []).append((pattern, flags))
+        parts = [f"(?{f}:{p})" if f else f"(?:{p})" for p, f in _PATTERNS[ext]]
+        _COMPILED[ext] = re.compile("|".join(parts))
+
+def register_analyzer(extensions, analyzer):
+    """Registers a function(content) -> [dependency names] for file types regexes cannot handle."""
+    for ext in extensions:
+        _ANALYZERS[ext.lower()] = analyzer
+
+def scan_source(content, file_ext):
+    """Returns the dependency names found by every scanner registered for file_ext."""
+    file_ext = file_ext.lower()
+    deps = []
+    if file_ext in _ANALYZERS:
+        deps.extend(_ANALYZERS[file_ext](content))
+    regex = _COMPILED.get(file_ext)
+    if regex is not None:
+        for match in regex.finditer(content):
+            deps.append(next(g for g in match.groups() if g is not None))
+    return deps
+
+# Python: imports parsed with ast, stdlib dropped, mapped to PyPI distributions
+register_analyzer([".py"], python_dependencies)
+# R: 'library(package)' or 'require(package)'
+register_scanner([".r"], r"(?:library|require)\(([a-zA-Z0-9\.]+)\)")
+# Shell: 'apt-get install package'
+register_scanner([".sh", ".bash"], r"apt-get\s+install\s+(?:-y\s+)?([\w\-\s]+)")
+
+def _trie_pattern(words):
+    """Regex source matching any of words, with shared prefixes factored out.
+
+    Each character position is one set of alternatives instead of one per
+    word, so matching cost stays flat as the vocabulary grows.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def emit(node):
+        alts = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return emit(trie)
+
+class KeywordMatcher:
+    """Finds any of a (possibly very large) vocabulary in one pass over a text.
+
+    Matching is case-insensitive on whole words, like rf"\\b{tool}\\b";
+    where two words overlap in the text, the longest one is reported.
+    """
+
+    def __init__(self, vocabulary):
+        self.canonical = {word.lower(): word for word in vocabulary}
+        pattern = _trie_pattern(self.canonical)
+        self.regex = re.compile(rf"(?<!\w)(?:{pattern})(?!\w)", re.IGNORECASE) if pattern else None
+
+    def find(self, text):
+        """Returns the set of vocabulary words (original spelling) present in text."""
+        if self.regex is None:
+            return set()
+        found = (self.canonical.get(m.group(0).lower()) for m in self.regex.finditer(text))
+        return {word for word in found if word}
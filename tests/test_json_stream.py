@@ -0,0 +1,40 @@
+import json
+
+import pytest
+
+from json_stream import iter_events, iter_items, iter_records
+
+DOCUMENT = {
+    "owner/repo": {"name": "Tool \"quoted\" \\ back", "version": 1.5, "keywords": ["a", "b,c"], "ok": True},
+    "other/repo": {"author": [{"name": "Ünïcode ✓", "@id": None}], "nested": {"deep": [[], {}, -2e3]}},
+    "empty/repo": {},
+}
+
+def _chunks(text, size):
+    return (text[i:i + size] for i in range(0, len(text), size))
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 100000])
+def test_records_survive_any_chunk_boundary(size):
+    text = json.dumps(DOCUMENT, indent=2)
+    assert dict(iter_records(_chunks(text, size))) == DOCUMENT
+
+@pytest.mark.parametrize("size", [1, 5, 4096])
+def test_items_of_a_top_level_array(size):
+    items = [{"timestamp": "2026-01-01T00:00:00Z", "place": "A"}, 3, "x", [1, [2]], None]
+    assert list(iter_items(_chunks(json.dumps(items), size))) == items
+
+def test_records_are_yielded_before_the_document_ends():
+    text = json.dumps(DOCUMENT)
+    truncated = text[:text.index('"other/repo"')]
+    records = iter_records(_chunks(truncated, 10))
+    assert next(records) == ("owner/repo", DOCUMENT["owner/repo"])
+
+def test_wrong_top_level_type():
+    with pytest.raises(ValueError):
+        list(iter_records(["[1, 2]"]))
+    with pytest.raises(ValueError):
+        list(iter_items(['{"a": 1}']))
+
+def test_invalid_json_is_reported():
+    with pytest.raises(ValueError):
+        list(iter_events(['{"a": @}']))
@@ -0,0 +1,23 @@
+from licenses import normalize_license, stack_compatibility
+
+def test_normalizes_ids_aliases_and_urls():
+    assert normalize_license("mit") == "MIT"
+    assert normalize_license("Apache License, Version 2.0") == "Apache-2.0"
+    assert normalize_license("https://spdx.org/licenses/GPL-3.0-or-later.html") == "GPL-3.0-or-later"
+    assert normalize_license("http://www.apache.org/licenses/LICENSE-2.0") == "Apache-2.0"
+    assert normalize_license("Proprietary") is None
+
+def test_permissive_and_copyleft_combine_under_the_copyleft():
+    outbound, unknown = stack_compatibility(["MIT", "GPL-3.0-only"])
+    assert "GPL-3.0-only" in outbound and "MIT" not in outbound
+    assert unknown == []
+
+def test_incompatible_stack():
+    outbound, _ = stack_compatibility(["Apache-2.0", "GPL-2.0-only"])
+    assert outbound == []
+
+def test_unknown_licenses_are_not_checked():
+    assert stack_compatibility(["Proprietary"]) == (None, ["Proprietary"])
+    assert stack_compatibility([]) == (None, [])
+    outbound, unknown = stack_compatibility(["MIT", "Proprietary"])
+    assert "MIT" in outbound and unknown == ["Proprietary"]
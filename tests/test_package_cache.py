@@ -0,0 +1,67 @@
+import http.client
+import os
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import package_cache
+
+@pytest.fixture
+def package_dir(tmp_path, monkeypatch):
+    path = tmp_path / "packages"
+    (path / "archive.ubuntu.com").mkdir(parents=True)
+    monkeypatch.setattr(package_cache, "PACKAGE_DIR", str(path))
+    return path
+
+@pytest.mark.parametrize("url", [
+    "http://archive.ubuntu.com/../../../../tmp/secret.zip",
+    "http://archive.ubuntu.com/ubuntu/../../../secret.deb",
+    "https://files.pythonhosted.org/packages/../../../secret.whl",
+    "http://archive.ubuntu.com/..",
+])
+def test_traversal_is_rejected(package_dir, url):
+    assert package_cache.cache_path(url) is None
+
+def test_symlinks_out_of_the_cache_are_rejected(package_dir, tmp_path):
+    (tmp_path / "outside").mkdir()
+    os.symlink(tmp_path / "outside", package_dir / "archive.ubuntu.com" / "link")
+    assert package_cache.cache_path("http://archive.ubuntu.com/link/secret.deb") is None
+
+def test_normal_artifacts_stay_under_the_cache(package_dir):
+    path = package_cache.cache_path("https://files.pythonhosted.org/packages/ab/cd/pkg-1.0-py3-none-any.whl?x=1")
+    assert path == os.path.join(str(package_dir), "files.pythonhosted.org/packages/ab/cd/pkg-1.0-py3-none-any.whl")
+
+def test_apt_proxy_allowlist():
+    assert package_cache.apt_host_allowed("archive.ubuntu.com")
+    assert package_cache.apt_host_allowed("nl.archive.ubuntu.com")
+    assert not package_cache.apt_host_allowed("evilarchive.ubuntu.com")
+    assert not package_cache.apt_host_allowed("169.254.169.254")
+    assert not package_cache.apt_host_allowed("api.github.com")
+
+@pytest.fixture
+def server(package_dir):
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), package_cache.PackageCacheHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd.server_address
+    httpd.shutdown()
+    httpd.server_close()
+
+def _get(address, path):
+    conn = http.client.HTTPConnection(*address, timeout=5)
+    conn.request("GET", path)
+    response = conn.getresponse()
+    return response.status, response.read()
+
+def test_server_refuses_traversal_before_touching_disk(server, tmp_path):
+    secret = tmp_path / "secret_host_file.zip"
+    secret.write_bytes(b"secret")
+    status, body = _get(server, f"http://archive.ubuntu.com/../../../../../../../..{secret}")
+    assert status == 400 and b"secret" not in body
+    status, body = _get(server, f"/pypi/files/../../../../../../../..{secret}")
+    assert status == 400 and b"secret" not in body
+
+def test_server_is_not_an_open_proxy(server):
+    assert _get(server, "http://169.254.169.254/latest/meta-data/")[0] == 403
+    assert _get(server, "http://api.github.com/user")[0] == 403
@@ -0,0 +1,24 @@
+from python_imports import parse_requirements, python_dependencies
+
+def test_imports_mapped_to_distributions_without_stdlib():
+    source = "import os, sys\nimport numpy as np\nfrom sklearn.linear_model import X\nimport yaml\n"
+    assert python_dependencies(source) == ["numpy", "scikit-learn", "PyYAML"]
+
+def test_strings_comments_and_relative_imports_are_ignored():
+    source = (
+        '"""\nimport fake_docstring_dep\n"""\n'
+        "# import fake_comment_dep\n"
+        "text = 'from fake_string_dep import x'\n"
+        "from . import sibling\n"
+        "from .pkg import other\n"
+        "import requests\n"
+    )
+    assert python_dependencies(source) == ["requests"]
+
+def test_files_that_do_not_parse_fall_back_to_tokens():
+    source = "import urllib2\nprint 'import fake_py2_string'\nfrom bs4 import BeautifulSoup\n# import nope\n"
+    assert python_dependencies(source) == ["urllib2", "beautifulsoup4"]
+
+def test_requirements_txt():
+    content = "numpy>=1.0  # pinned\n-r other.txt\n\nrequests[socks]; python_version>'3'\nnumpy\n"
+    assert parse_requirements(content) == ["numpy", "requests"]
@@ -0,0 +1,37 @@
+import time
+
+from ratelimit import TokenBucket
+
+def test_retry_after_pauses_every_worker():
+    bucket = TokenBucket(rate=10, capacity=5)
+    bucket.update_from_headers({"Retry-After": "30"})
+    assert 29 < bucket.paused_until - time.monotonic() <= 30
+
+def test_exhausted_remaining_pauses_until_reset():
+    bucket = TokenBucket(rate=10, capacity=5)
+    bucket.update_from_headers({"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(time.time() + 60)})
+    assert 59 < bucket.paused_until - time.monotonic() <= 62
+
+def test_remaining_budget_is_spread_over_the_window():
+    bucket = TokenBucket(rate=10, capacity=5)
+    bucket.update_from_headers({"X-RateLimit-Remaining": "100", "X-RateLimit-Reset": str(time.time() + 1000)})
+    assert 0.09 < bucket.rate < 0.11
+    assert bucket.paused_until == 0.0
+
+def test_rate_never_exceeds_the_configured_ceiling():
+    bucket = TokenBucket(rate=2, capacity=5)
+    bucket.update_from_headers({"X-RateLimit-Remaining": "5000", "X-RateLimit-Reset": str(time.time() + 10)})
+    assert bucket.rate == 2
+
+def test_malformed_headers_are_ignored():
+    bucket = TokenBucket(rate=10, capacity=5)
+    bucket.update_from_headers({"Retry-After": "Wed, 21 Oct 2026 07:28:00 GMT"})
+    bucket.update_from_headers({"X-RateLimit-Remaining": "many", "X-RateLimit-Reset": "soon"})
+    bucket.update_from_headers({})
+    assert bucket.rate == 10 and bucket.paused_until == 0.0
+
+def test_acquire_spends_tokens_up_to_capacity():
+    bucket = TokenBucket(rate=1000, capacity=3)
+    for _ in range(3):
+        bucket.acquire()
+    assert bucket.tokens < 1
@@ -0,0 +1,31 @@
+import random
+import re
+
+from scanners import KeywordMatcher, scan_source
+
+VOCABULARY = ["Multipass", "Snap", "Git", "GitHub", "Ubuntu", "Bash", "Python", "Python3",
+              "RO-Crate", "CodeMeta", "JSON-LD", "R", "Java", "JavaScript"]
+
+def _regex_loop(text):
+    # The per-tool search KeywordMatcher replaced
+    return {tool for tool in VOCABULARY if re.search(rf"\b{re.escape(tool)}\b", text, re.IGNORECASE)}
+
+def test_matches_the_old_regex_loop_on_separated_words():
+    rng = random.Random(42)
+    filler = ["the", "install", "gitlab", "snapshot", "python-ish", "(", ")", ",", "javas", "r2", "\n"]
+    for _ in range(300):
+        words = [rng.choice(VOCABULARY + filler) for _ in range(20)]
+        text = " ".join(w.upper() if rng.random() < 0.2 else w for w in words)
+        assert KeywordMatcher(VOCABULARY).find(text) == _regex_loop(text)
+
+def test_reports_original_spelling_and_whole_words_only():
+    matcher = KeywordMatcher(VOCABULARY)
+    assert matcher.find("uses GITHUB and python3, not snapshots or Gitlab") == {"GitHub", "Python3"}
+
+def test_empty_vocabulary():
+    assert KeywordMatcher([]).find("anything") == set()
+
+def test_scan_source_registry():
+    assert scan_source("library(dplyr)\nrequire(ggplot2)", ".R") == ["dplyr", "ggplot2"]
+    assert scan_source("import numpy\nimport os", ".py") == ["numpy"]
+    assert scan_source("whatever", ".unknown") == []
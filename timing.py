@@ -0,0 +1,158 @@
+import argparse
+import functools
+import json
+import math
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+# Every span of every run, one JSON object per line
+TIMINGS_FILE = os.environ.get("CODEMETA_TIMINGS_FILE", "provisioning_timings.jsonl")
+SUMMARY_FILE = "provisioning_timings_summary.json"
+# Written inside the guest by timed_command(), read back by collect_guest_spans()
+GUEST_LOG = "/var/log/provision-timings.log"
+
+# cloud-init stages and modules worth reporting, by their 'analyze dump' name
+CLOUD_INIT_PHASES = {
+    "init-local": "cloud_init_init_local",
+    "init-network": "cloud_init_init_network",
+    "modules-config": "cloud_init_modules_config",
+    "modules-final": "cloud_init_modules_final",
+    "modules-final/config-package-update-upgrade-install": "package_install",
+    "modules-final/config-scripts-user": "runcmd",
+}
+
+RUN_ID = uuid.uuid4().hex[:12]
+_lock = threading.Lock()
+
+def new_run():
+    """Starts a new run id, e.g. for each rollout in a long-lived process."""
+    global RUN_ID
+    RUN_ID = uuid.uuid4().hex[:12]
+    return RUN_ID
+
+def record(phase, seconds, start=None, source="host", ok=True, **attrs):
+    """Appends one span to TIMINGS_FILE."""
+    entry = {"run": RUN_ID, "phase": phase, "source": source, "start": start,
+             "seconds": round(seconds, 3), "ok": ok, **attrs}
+    with _lock, open(TIMINGS_FILE, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry) + "\n")
+
+@contextmanager
+def span(phase, **attrs):
+    """Times the block with a monotonic clock and records it, also when it raises."""
+    start, t0 = time.time(), time.perf_counter()
+    ok = False
+    try:
+        yield
+        ok = True
+    finally:
+        record(phase, time.perf_counter() - t0, start=start, ok=ok, **attrs)
+
+def timed(phase):
+    """Decorator form of span() for whole functions."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(phase):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def timed_command(phase, command):
+    """A shell line that runs command and logs its guest-side timing to GUEST_LOG, keeping its exit status."""
+    # '&& ||' so that a failure is still logged under 'set -e' (the container backend's script)
+    return (f't0=$(date +%s.%N); {command} && rc=0 || rc=$?; '
+            f'echo "{phase} $t0 $(date +%s.%N) $rc" >> {GUEST_LOG}; (exit $rc)')
+
+def _cloud_init_spans(dump):
+    starts = {}
+    for event in json.loads(dump):
+        name = event.get("name", "").replace("_", "-")
+        if event.get("event_type") == "start":
+            starts[name] = event["timestamp"]
+        elif event.get("event_type") == "finish" and name in CLOUD_INIT_PHASES and name in starts:
+            yield (CLOUD_INIT_PHASES[name], starts[name], event["timestamp"] - starts[name],
+                   event.get("result") == "SUCCESS")
+
+def collect_guest_spans(vm_name, backend, cloud_init=True):
+    """Records the guest's own timings: cloud-init stages and timed_command() phases.
+
+    Uses backend.run() (multipass exec / container exec); anything missing is
+    skipped. Pass cloud_init=False for clones, whose cloud-init log is the one
+    of the image they were cloned from.
+    """
+    spans = []
+    dump = backend.run(vm_name, ["sudo", "cloud-init", "analyze", "dump"]) if cloud_init else None
+    if dump:
+        try:
+            spans.extend(_cloud_init_spans(dump))
+        except (ValueError, KeyError):
+            pass
+    for line in (backend.run(vm_name, ["cat", GUEST_LOG]) or "").splitlines():
+        parts = line.split()
+        if len(parts) == 4:
+            phase, start, end, rc = parts
+            spans.append((phase, float(start), float(end) - float(start), rc == "0"))
+    for phase, start, seconds, ok in spans:
+        record(phase, seconds, start=start, source="guest", ok=ok, vm=vm_name, backend=backend.name)
+    return len(spans)
+
+def read_spans(path=TIMINGS_FILE):
+    if not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    return sorted_values[max(math.ceil(q / 100 * len(sorted_values)) - 1, 0)]
+
+def summarize(path=TIMINGS_FILE, last_runs=None, run=None):
+    """{phase: {count, failures, p50, p95, max, total}} across runs (only the last N, or one run, if given)."""
+    spans = list(read_spans(path))
+    if last_runs:
+        runs = list(dict.fromkeys(s["run"] for s in spans))[-last_runs:]
+        spans = [s for s in spans if s["run"] in runs]
+    if run:
+        spans = [s for s in spans if s["run"] == run]
+    by_phase = {}
+    for s in spans:
+        by_phase.setdefault(s["phase"], []).append(s)
+    summary = {}
+    for phase, items in by_phase.items():
+        values = sorted(s["seconds"] for s in items)
+        summary[phase] = {
+            "count": len(values),
+            "failures": sum(1 for s in items if not s["ok"]),
+            "p50": percentile(values, 50),
+            "p95": percentile(values, 95),
+            "max": values[-1],
+            "total": round(sum(values), 3),
+        }
+    return summary
+
+def print_summary(summary):
+    print(f"{'phase':32} {'count':>6} {'fail':>5} {'p50':>9} {'p95':>9} {'total':>10}")
+    for phase, s in sorted(summary.items(), key=lambda item: -item[1]["total"]):
+        print(f"{phase:32} {s['count']:>6} {s['failures']:>5} {s['p50']:>8.2f}s {s['p95']:>8.2f}s {s['total']:>9.1f}s")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize provisioning phase timings (p50/p95 across runs).")
+    parser.add_argument("--input", default=TIMINGS_FILE)
+    parser.add_argument("--output", default=SUMMARY_FILE)
+    parser.add_argument("--last-runs", type=int, help="Only include the most recent N runs")
+    parser.add_argument("--run", help="Only include this run id")
+    args = parser.parse_args()
+
+    summary = summarize(args.input, args.last_runs, args.run)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=4)
+    print_summary(summary)
+    print(f"Summary written to {args.output}")
@@ -0,0 +1,145 @@
+import argparse
+import importlib
+import os
+import re
+import shutil
+import subprocess
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import yaml
+
+from backends import BACKENDS, shared_dry_run
+from run_vm_rocrate import launch_vm_with_deps
+import timing
+
+# Crates with a source "url" are launched with the repo-cloning variant
+launch_vm_with_repo = importlib.import_module("2run_vm_rocrate").launch_vm_with_repo
+
+# Left free on the host for the OS and multipass itself (vCPUs are time-shared, so all cores are offered)
+HOST_RESERVE = {"cpus": 0, "memory": 1 << 30, "disk": 5 << 30}
+
+_UNITS = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+
+def parse_size(value):
+    """Bytes in a multipass size such as '512M', '4G' or '10GiB'."""
+    match = re.fullmatch(r"\s*([0-9.]+)\s*([KMGT]?)(?:i?B)?\s*", str(value), re.I)
+    if not match:
+        raise ValueError(f"Invalid size: {value!r}")
+    return int(float(match.group(1)) * _UNITS[match.group(2).upper()])
+
+def _available_memory():
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        # macOS has no /proc; fall back to total physical memory
+        return int(subprocess.run(["sysctl", "-n", "hw.memsize"], capture_output=True, text=True).stdout)
+    except (OSError, ValueError):
+        return None
+
+def host_capacity(path=os.path.expanduser("~")):
+    """Free cpus, memory and disk (bytes) of the host, minus HOST_RESERVE."""
+    memory = _available_memory()
+    return {
+        "cpus": max((os.cpu_count() or 1) - HOST_RESERVE["cpus"], 1),
+        "memory": max(memory - HOST_RESERVE["memory"], 0) if memory is not None else float("inf"),
+        "disk": max(shutil.disk_usage(path).free - HOST_RESERVE["disk"], 0),
+    }
+
+def main_node(crate_data):
+    return next(n for n in crate_data["@graph"] if n["@id"] == "./")
+
+def crate_request(crate_data):
+    """The cpus/memory/disk a crate's VM needs, from its 'virtualization' block."""
+    specs = main_node(crate_data)["virtualization"]
+    return {"cpus": int(specs["cpus"]), "memory": parse_size(specs["memory"]), "disk": parse_size(specs["disk"])}
+
+def fits(request, free):
+    return all(request[k] <= free[k] for k in request)
+
+def _launch(crate_data, golden=False, backend=None):
+    launch = launch_vm_with_repo if main_node(crate_data).get("url") else launch_vm_with_deps
+    start = time.time()
+    launch(crate_data, quiet=True, golden=golden, backend=backend)
+    return time.time() - start
+
+def launch_crates(crate_files, max_parallel=None, capacity=None, golden=False, backend=None):
+    """Boots one VM per RO-Crate file, concurrently while the host has room.
+
+    A crate is started as soon as its cpus/memory/disk request fits in what
+    the running VMs leave free (first fit, in the given order), so the host
+    is never overcommitted. Results are printed as each VM finishes;
+    returns a list of (crate file, vm name, error or None, seconds).
+    """
+    free = dict(capacity or host_capacity())
+    pending = []
+    for path in crate_files:
+        with open(path, "r") as f:
+            crate_data = yaml.safe_load(f)
+        request = crate_request(crate_data)
+        if not fits(request, free):
+            print(f"❌ {path}: needs {request}, more than the host can ever offer")
+            continue
+        pending.append((path, crate_data, request))
+
+    results = []
+    total = len(pending)
+    running = {}
+    with ThreadPoolExecutor(max_workers=max_parallel or max(total, 1)) as pool:
+        while pending or running:
+            for item in list(pending):
+                if max_parallel and len(running) >= max_parallel:
+                    break
+                path, crate_data, request = item
+                if fits(request, free):
+                    for k in request:
+                        free[k] -= request[k]
+                    pending.remove(item)
+                    running[pool.submit(_launch, crate_data, golden, backend)] = item
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                path, crate_data, request = running.pop(future)
+                for k in request:
+                    free[k] += request[k]
+                name = main_node(crate_data)["name"].lower().replace(" ", "-")
+                try:
+                    seconds, error = future.result(), None
+                    print(f"[{len(results) + 1}/{total}] ✅ {name} ({path}) ready in {seconds:.0f}s")
+                except Exception as e:
+                    seconds = 0.0
+                    error = (getattr(e, "stderr", None) or str(e)).strip()
+                    print(f"[{len(results) + 1}/{total}] ❌ {name} ({path}) failed: {error}")
+                results.append((path, name, error, seconds))
+
+    print(f"Finished: {sum(1 for r in results if r[2] is None)}/{total} VMs running.")
+    print(f"Phase timings of run {timing.RUN_ID} (all runs: python timing.py):")
+    timing.print_summary(timing.summarize(run=timing.RUN_ID))
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Launch the VMs of many RO-Crate files concurrently.")
+    parser.add_argument("crates", nargs="+", help="ro-crate-metadata.yaml files")
+    parser.add_argument("--max-parallel", type=int, help="Upper bound on simultaneous launches")
+    parser.add_argument("--golden", action="store_true",
+                        help="Clone VMs from cached images of their dependency sets instead of installing packages")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), help="Provisioning backend (default $VM_BACKEND or multipass)")
+    parser.add_argument("--dry-run-sleep", action="store_true",
+                        help="With the dry-run backend, wait the simulated boot/install time (or set VM_DRY_RUN_SLEEP=1)")
+    parser.add_argument("--dry-run-log", metavar="FILE",
+                        help="With the dry-run backend, append every simulated launch to FILE as JSON lines (or set VM_DRY_RUN_LOG)")
+    args = parser.parse_args()
+    backend = args.backend
+    if (backend or os.environ.get("VM_BACKEND")) == "dry-run":
+        backend = shared_dry_run()
+        backend.sleep = backend.sleep or args.dry_run_sleep
+        backend.log_file = args.dry_run_log or backend.log_file
+    launch_crates(args.crates, max_parallel=args.max_parallel, golden=args.golden, backend=backend)
+    if backend is not None and not isinstance(backend, str):
+        print(f"Dry run: {len(backend.launches)} launches, {sum(l[2] for l in backend.launches):.0f}s simulated"
+              + (f", recorded in {backend.log_file}" if backend.log_file else ""))